@@ -27,7 +27,7 @@ def init_database():
         print("✅ Conexión a la base de datos verificada")
 
     except Exception as e:
-        logger.error(f"Error al inicializar base de datos: {e}")
+        logger.error("Error al inicializar base de datos: %s", e)
         print(f"❌ Error al inicializar base de datos: {e}")
         raise
 
@@ -86,7 +86,7 @@ def create_budget(
 
     except Exception as e:
         console.print(f"[red]❌ Error al crear presupuesto: {e}[/red]")
-        logger.error(f"Error en create_budget: {e}")
+        logger.error("Error en create_budget: %s", e)
         raise typer.Exit(1)
     finally:
         if 'service' in locals():
@@ -130,7 +130,7 @@ def add_budget_category(
         raise typer.Exit(1)
     except Exception as e:
         console.print(f"[red]❌ Error al agregar categoría: {e}[/red]")
-        logger.error(f"Error en add_budget_category: {e}")
+        logger.error("Error en add_budget_category: %s", e)
         raise typer.Exit(1)
     finally:
         if 'service' in locals():
@@ -183,7 +183,7 @@ def list_budgets(
 
     except Exception as e:
         console.print(f"[red]❌ Error al listar presupuestos: {e}[/red]")
-        logger.error(f"Error en list_budgets: {e}")
+        logger.error("Error en list_budgets: %s", e)
         raise typer.Exit(1)
     finally:
         if 'service' in locals():
@@ -255,7 +255,7 @@ def analyze_budget(
 
             for category in analysis['categories']:
                 # Formatear progreso
-                progress_pct = category['percentage_used']
+                progress_pct = category.percentage_used
                 if progress_pct >= 100:
                     progress_str = f"[red]{progress_pct:.1f}%[/red]"
                 elif progress_pct >= 80:
@@ -264,7 +264,7 @@ def analyze_budget(
                     progress_str = f"[green]{progress_pct:.1f}%[/green]"
 
                 # Estado
-                if category['is_over_budget']:
+                if category.is_over_budget:
                     status_str = "[red]⚠️ Excedido[/red]"
                 elif progress_pct >= 90:
                     status_str = "[yellow]⚡ Cerca[/yellow]"
@@ -272,10 +272,10 @@ def analyze_budget(
                     status_str = "[green]✅ OK[/green]"
 
                 categories_table.add_row(
-                    category['category_name'],
-                    f"${category['allocated_amount']:,.2f}",
-                    f"${category['spent_amount']:,.2f}",
-                    f"${category['remaining_amount']:,.2f}",
+                    category.category_name,
+                    f"${category.allocated_amount:,.2f}",
+                    f"${category.spent_amount:,.2f}",
+                    f"${category.remaining_amount:,.2f}",
                     progress_str,
                     status_str
                 )
@@ -287,7 +287,7 @@ def analyze_budget(
 
     except Exception as e:
         console.print(f"[red]❌ Error al analizar presupuesto: {e}[/red]")
-        logger.error(f"Error en analyze_budget: {e}")
+        logger.error("Error en analyze_budget: %s", e)
         raise typer.Exit(1)
     finally:
         if 'service' in locals():
@@ -329,7 +329,7 @@ def show_current_budget(
 
     except Exception as e:
         console.print(f"[red]❌ Error al obtener presupuesto actual: {e}[/red]")
-        logger.error(f"Error en show_current_budget: {e}")
+        logger.error("Error en show_current_budget: %s", e)
         raise typer.Exit(1)
     finally:
         if 'service' in locals():
@@ -377,7 +377,7 @@ def delete_budget(
 
     except Exception as e:
         console.print(f"[red]❌ Error al eliminar presupuesto: {e}[/red]")
-        logger.error(f"Error en delete_budget: {e}")
+        logger.error("Error en delete_budget: %s", e)
         raise typer.Exit(1)
     finally:
         if 'service' in locals():
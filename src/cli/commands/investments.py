@@ -96,7 +96,7 @@ def add_investment(
         raise typer.Exit(1)
     except Exception as e:
         console.print(f"[red]❌ Error al agregar inversión: {e}[/red]")
-        logger.error(f"Error en add_investment: {e}")
+        logger.error("Error en add_investment: %s", e)
         raise typer.Exit(1)
     finally:
         if 'service' in locals():
@@ -194,7 +194,7 @@ def list_investments(
 
     except Exception as e:
         console.print(f"[red]❌ Error al listar inversiones: {e}[/red]")
-        logger.error(f"Error en list_investments: {e}")
+        logger.error("Error en list_investments: %s", e)
         raise typer.Exit(1)
     finally:
         if 'service' in locals():
@@ -252,7 +252,7 @@ def update_investment_value(
         raise typer.Exit(1)
     except Exception as e:
         console.print(f"[red]❌ Error al actualizar valor: {e}[/red]")
-        logger.error(f"Error en update_investment_value: {e}")
+        logger.error("Error en update_investment_value: %s", e)
         raise typer.Exit(1)
     finally:
         if 'service' in locals():
@@ -329,24 +329,24 @@ def show_portfolio() -> None:
         if summary['top_performers']:
             console.print("\n[bold]🏆 Mejores Inversiones:[/bold]")
             for i, inv in enumerate(summary['top_performers'], 1):
-                return_pct = inv['return_percentage']
+                return_pct = inv.return_percentage
                 color = "green" if return_pct >= 0 else "red"
                 symbol = "+" if return_pct >= 0 else ""
 
-                console.print(f"  {i}. {inv['name']} - [{color}]{symbol}{return_pct:.1f}%[/{color}] (${inv['current_value']:,.2f})")
+                console.print(f"  {i}. {inv.name} - [{color}]{symbol}{return_pct:.1f}%[/{color}] (${inv.current_value:,.2f})")
 
         if summary['worst_performers'] and len(summary['worst_performers']) > 0:
             console.print("\n[bold]📉 Inversiones con Menor Rendimiento:[/bold]")
             for i, inv in enumerate(summary['worst_performers'], 1):
-                return_pct = inv['return_percentage']
+                return_pct = inv.return_percentage
                 color = "green" if return_pct >= 0 else "red"
                 symbol = "+" if return_pct >= 0 else ""
 
-                console.print(f"  {i}. {inv['name']} - [{color}]{symbol}{return_pct:.1f}%[/{color}] (${inv['current_value']:,.2f})")
+                console.print(f"  {i}. {inv.name} - [{color}]{symbol}{return_pct:.1f}%[/{color}] (${inv.current_value:,.2f})")
 
     except Exception as e:
         console.print(f"[red]❌ Error al mostrar portafolio: {e}[/red]")
-        logger.error(f"Error en show_portfolio: {e}")
+        logger.error("Error en show_portfolio: %s", e)
         raise typer.Exit(1)
     finally:
         if 'service' in locals():
@@ -428,7 +428,7 @@ def show_investment_performance(
 
     except Exception as e:
         console.print(f"[red]❌ Error al mostrar rendimiento: {e}[/red]")
-        logger.error(f"Error en show_investment_performance: {e}")
+        logger.error("Error en show_investment_performance: %s", e)
         raise typer.Exit(1)
     finally:
         if 'service' in locals():
@@ -473,7 +473,7 @@ def delete_investment(
 
     except Exception as e:
         console.print(f"[red]❌ Error al eliminar inversión: {e}[/red]")
-        logger.error(f"Error en delete_investment: {e}")
+        logger.error("Error en delete_investment: %s", e)
         raise typer.Exit(1)
     finally:
         if 'service' in locals():
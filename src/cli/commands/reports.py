@@ -163,7 +163,7 @@ Comparación con el mes anterior:
 
     except Exception as e:
         console.print(f"[red]❌ Error al generar reporte mensual: {e}[/red]")
-        logger.error(f"Error en monthly_report: {e}")
+        logger.error("Error en monthly_report: %s", e)
         raise typer.Exit(1)
     finally:
         if 'service' in locals():
@@ -294,7 +294,7 @@ def yearly_report(
 
     except Exception as e:
         console.print(f"[red]❌ Error al generar reporte anual: {e}[/red]")
-        logger.error(f"Error en yearly_report: {e}")
+        logger.error("Error en yearly_report: %s", e)
         raise typer.Exit(1)
     finally:
         if 'service' in locals():
@@ -397,7 +397,7 @@ def categories_report(
 
     except Exception as e:
         console.print(f"[red]❌ Error al generar reporte de categorías: {e}[/red]")
-        logger.error(f"Error en categories_report: {e}")
+        logger.error("Error en categories_report: %s", e)
         raise typer.Exit(1)
     finally:
         if 'service' in locals():
@@ -531,7 +531,7 @@ def cash_flow_report(
 
     except Exception as e:
         console.print(f"[red]❌ Error al generar reporte de flujo de efectivo: {e}[/red]")
-        logger.error(f"Error en cash_flow_report: {e}")
+        logger.error("Error en cash_flow_report: %s", e)
         raise typer.Exit(1)
     finally:
         if 'service' in locals():
@@ -89,7 +89,7 @@ def add_transaction(
         raise typer.Exit(1)
     except Exception as e:
         console.print(f"[red]❌ Error al agregar transacción: {e}[/red]")
-        logger.error(f"Error en add_transaction: {e}")
+        logger.error("Error en add_transaction: %s", e)
         raise typer.Exit(1)
     finally:
         if 'service' in locals():
@@ -119,8 +119,8 @@ def list_transactions(
                 console.print("[red]❌ Tipo debe ser 'income' or 'expense'[/red]")
                 raise typer.Exit(1)
 
-        # Obtener transacciones
-        transactions = service.get_transactions(
+        # Obtener solo las columnas que se muestran en la tabla
+        transactions = service.get_transactions_summary_rows(
             limit=limit,
             transaction_type=transaction_type,
             category_name=category,
@@ -154,7 +154,7 @@ def list_transactions(
                 transaction.id[:8] + "...",
                 transaction.transaction_date.strftime("%Y-%m-%d"),
                 transaction.description[:30] + ("..." if len(transaction.description) > 30 else ""),
-                transaction.category.name if transaction.category else "Sin categoría",
+                transaction.category_name or "Sin categoría",
                 type_str,
                 amount_str
             )
@@ -178,7 +178,7 @@ def list_transactions(
 
     except Exception as e:
         console.print(f"[red]❌ Error al listar transacciones: {e}[/red]")
-        logger.error(f"Error en list_transactions: {e}")
+        logger.error("Error en list_transactions: %s", e)
         raise typer.Exit(1)
     finally:
         if 'service' in locals():
@@ -229,7 +229,7 @@ def transaction_summary(
 
     except Exception as e:
         console.print(f"[red]❌ Error al generar resumen: {e}[/red]")
-        logger.error(f"Error en transaction_summary: {e}")
+        logger.error("Error en transaction_summary: %s", e)
         raise typer.Exit(1)
     finally:
         if 'service' in locals():
@@ -274,7 +274,7 @@ def delete_transaction(
 
     except Exception as e:
         console.print(f"[red]❌ Error al eliminar transacción: {e}[/red]")
-        logger.error(f"Error en delete_transaction: {e}")
+        logger.error("Error en delete_transaction: %s", e)
         raise typer.Exit(1)
     finally:
         if 'service' in locals():
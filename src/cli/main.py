@@ -77,7 +77,7 @@ def summary(
 
     except Exception as e:
         console.print(f"[red]Error al generar resumen: {e}[/red]")
-        logger.error(f"Error en comando summary: {e}")
+        logger.error("Error en comando summary: %s", e)
         raise typer.Exit(1)
 
 
@@ -118,11 +118,11 @@ def quick_add(
         console.print()
 
         service.close()
-        logger.info(f"Transacción agregada: {amount} - {description}")
+        logger.info("Transacción agregada: %s - %s", amount, description)
 
     except Exception as e:
         console.print(f"[red]Error al agregar transacción: {e}[/red]")
-        logger.error(f"Error en comando quick_add: {e}")
+        logger.error("Error en comando quick_add: %s", e)
         raise typer.Exit(1)
 
 
@@ -145,7 +145,7 @@ def status() -> None:
 
     except Exception as e:
         console.print(f"[red]❌ Error en el sistema: {e}[/red]")
-        logger.error(f"Error en comando status: {e}")
+        logger.error("Error en comando status: %s", e)
         raise typer.Exit(1)
 
 
@@ -45,7 +45,7 @@ def summary(
 
     except Exception as e:
         console.print(f"[red]Error al generar resumen: {e}[/red]")
-        logger.error(f"Error en comando summary: {e}")
+        logger.error("Error en comando summary: %s", e)
         raise typer.Exit(1)
 
 
@@ -65,11 +65,11 @@ def add(
         console.print(f"📊 Tipo: {transaction_type}")
         console.print()
 
-        logger.info(f"Transacción agregada: {amount} - {description}")
+        logger.info("Transacción agregada: %s - %s", amount, description)
 
     except Exception as e:
         console.print(f"[red]Error al agregar transacción: {e}[/red]")
-        logger.error(f"Error en comando add: {e}")
+        logger.error("Error en comando add: %s", e)
         raise typer.Exit(1)
 
 
@@ -91,7 +91,7 @@ def status() -> None:
 
     except Exception as e:
         console.print(f"[red]❌ Error en el sistema: {e}[/red]")
-        logger.error(f"Error en comando status: {e}")
+        logger.error("Error en comando status: %s", e)
         raise typer.Exit(1)
 
 
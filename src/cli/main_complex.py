@@ -67,7 +67,7 @@ def summary(
 
     except Exception as e:
         console.print(f"[red]Error al generar resumen: {e}[/red]")
-        logger.error(f"Error en comando summary: {e}")
+        logger.error("Error en comando summary: %s", e)
         raise typer.Exit(1)
 
 
@@ -96,7 +96,7 @@ def status() -> None:
 
     except Exception as e:
         console.print(f"[red]❌ Error en el sistema: {e}[/red]")
-        logger.error(f"Error en comando status: {e}")
+        logger.error("Error en comando status: %s", e)
         raise typer.Exit(1)
 
 
@@ -1,5 +1,5 @@
 """Módulo de configuración de la aplicación."""
 
-from src.config.settings import Settings, get_settings, reload_settings
+from src.config.settings import Settings, get_settings, override_settings, reload_settings
 
-__all__ = ["Settings", "get_settings", "reload_settings"]
+__all__ = ["Settings", "get_settings", "override_settings", "reload_settings"]
@@ -94,3 +94,21 @@ def reload_settings() -> Settings:
     global _settings
     _settings = None
     return get_settings()
+
+
+def override_settings(**overrides: object) -> Settings:
+    """
+    Reemplazar valores concretos de la configuración activa.
+
+    A diferencia de `reload_settings`, no vuelve a leer ni validar el entorno:
+    copia la instancia actual con los campos indicados (útil para tests).
+
+    Args:
+        **overrides: Campos de `Settings` y sus nuevos valores
+
+    Returns:
+        La nueva configuración activa
+    """
+    global _settings
+    _settings = get_settings().model_copy(update=overrides)
+    return _settings
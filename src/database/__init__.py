@@ -1,6 +1,7 @@
 """Módulo de base de datos para Sales Command."""
 
 from src.database.connection import (
+    analyze_database,
     get_db_session,
     create_db_session,
     get_engine,
@@ -16,10 +17,12 @@ from src.database.models import (
     Investment,
     RecurringTransaction,
     Transaction,
+    TransactionTag,
 )
 
 __all__ = [
     # Conexión
+    "analyze_database",
     "get_db_session",
     "create_db_session",
     "get_engine",
@@ -34,4 +37,5 @@ __all__ = [
     "Investment",
     "RecurringTransaction",
     "Transaction",
+    "TransactionTag",
 ]
@@ -5,13 +5,15 @@ from __future__ import annotations
 from contextlib import contextmanager
 from typing import Generator
 
-from sqlalchemy import create_engine, event
+from sqlalchemy import create_engine, event, inspect
 from sqlalchemy.engine import Engine
 from sqlalchemy.orm import Session, sessionmaker
 from sqlalchemy.pool import StaticPool
 
 from src.config.settings import get_settings
+from src.database.migrations import upgrade_schema
 from src.database.models import Base
+from src.database.search import create_search_index, drop_search_index
 from src.utils.logging import get_logger
 
 logger = get_logger(__name__)
@@ -47,14 +49,23 @@ def get_engine() -> Engine:
                 cursor.close()
 
         else:
+            # Timeout de conexión corto para fallar rápido ante caídas de red
+            connect_args: dict[str, object] = {"connect_timeout": 5}
+            if settings.database_url.startswith("postgresql"):
+                connect_args["application_name"] = settings.app_name
+
             _engine = create_engine(
                 settings.database_url,
                 pool_size=settings.db_pool_size,
                 max_overflow=10,
+                pool_pre_ping=True,  # Descartar conexiones cerradas por el servidor
+                pool_recycle=1800,
+                pool_use_lifo=True,
+                connect_args=connect_args,
                 echo=settings.debug,
             )
 
-        logger.info(f"Engine de base de datos creado: {settings.database_url}")
+        logger.info("Engine de base de datos creado: %s", settings.database_url)
 
     return _engine
 
@@ -114,13 +125,43 @@ def get_db_session() -> Generator[Session, None, None]:
 
 
 def init_database() -> None:
-    """Inicializar base de datos creando todas las tablas."""
+    """Inicializar base de datos creando todas las tablas.
+
+    Si todas las tablas ya existen se omite `create_all`, evitando la
+    reflexión tabla por tabla en cada invocación del CLI. Las bases creadas
+    con un esquema anterior reciben las migraciones pendientes, y el índice
+    de búsqueda de texto se crea (e indexa los datos previos) si falta.
+    """
     try:
         engine = get_engine()
-        Base.metadata.create_all(bind=engine)
-        logger.info("Base de datos inicializada correctamente")
+
+        existing_tables = set(inspect(engine).get_table_names())
+        if existing_tables.issuperset(Base.metadata.tables):
+            logger.debug("Esquema de base de datos ya existente")
+        else:
+            Base.metadata.create_all(bind=engine)
+            logger.info("Base de datos inicializada correctamente")
+
+        upgrade_schema(engine, existing_tables)
+
+        create_search_index(engine, existing_tables)
     except Exception as e:
-        logger.error(f"Error al inicializar base de datos: {e}")
+        logger.error("Error al inicializar base de datos: %s", e)
+        raise
+
+
+def analyze_database() -> None:
+    """Actualizar las estadísticas del planificador de consultas.
+
+    Conviene ejecutarlo tras inserciones masivas: sin estadísticas SQLite
+    puede elegir un índice poco selectivo o recorrer la tabla completa.
+    """
+    try:
+        with get_engine().begin() as connection:
+            connection.exec_driver_sql("ANALYZE")
+        logger.debug("Estadísticas de la base de datos actualizadas")
+    except Exception as e:
+        logger.error("Error al analizar base de datos: %s", e)
         raise
 
 
@@ -128,11 +169,18 @@ def reset_database() -> None:
     """Resetear base de datos eliminando y recreando todas las tablas."""
     try:
         engine = get_engine()
+        drop_search_index(engine)
         Base.metadata.drop_all(bind=engine)
         Base.metadata.create_all(bind=engine)
+        upgrade_schema(engine, set())
+        create_search_index(engine, set())
+
+        # Import diferido: report_service depende de este módulo
+        from src.services.report_service import invalidate_report_cache
+        invalidate_report_cache()
         logger.warning("Base de datos reseteada completamente")
     except Exception as e:
-        logger.error(f"Error al resetear base de datos: {e}")
+        logger.error("Error al resetear base de datos: %s", e)
         raise
 
 
@@ -0,0 +1,99 @@
+"""Migraciones de inicio para bases creadas con versiones anteriores del esquema.
+
+`create_all` solo crea las tablas que faltan: no agrega índices ni altera
+tablas existentes. Cada paso de `_STEPS` lleva una base existente a la
+versión siguiente y la versión aplicada se guarda en `schema_version`, así
+que en cada inicio solo se ejecutan los pasos pendientes.
+"""
+
+from __future__ import annotations
+
+import json
+from typing import Callable, List, Set
+
+from sqlalchemy import delete, insert, select
+from sqlalchemy.engine import Connection, Engine
+
+from src.database.models import Base, SchemaVersion, Transaction, TransactionTag
+from src.utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Índices reemplazados por los índices compuestos de los modelos
+_OBSOLETE_INDEXES = ("ix_transactions_transaction_date",)
+
+
+def _create_model_indexes(connection: Connection) -> None:
+    """Crear los índices declarados en los modelos que falten y quitar los obsoletos."""
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(connection, checkfirst=True)
+
+    for name in _OBSOLETE_INDEXES:
+        connection.exec_driver_sql(f"DROP INDEX IF EXISTS {name}")
+
+
+def _backfill_transaction_tags(connection: Connection) -> None:
+    """Crear las filas de transaction_tags a partir de la columna JSON `tags`.
+
+    Solo copia si transaction_tags está vacía (bases que ya la completaron
+    antes de registrar la versión). Las transacciones cuyos tags no son una
+    lista JSON válida se omiten (y se registran) en lugar de abortar el inicio.
+    """
+    if connection.execute(select(TransactionTag.transaction_id).limit(1)).first():
+        return
+
+    tagged = connection.execute(
+        select(Transaction.id, Transaction.tags).where(Transaction.tags.is_not(None))
+    ).all()
+
+    rows = []
+    for transaction_id, tags_json in tagged:
+        try:
+            tags = json.loads(tags_json) or []
+            if not isinstance(tags, list):
+                raise ValueError("no es una lista")
+            rows.extend(
+                {'transaction_id': transaction_id, 'tag': tag} for tag in dict.fromkeys(tags)
+            )
+        except (ValueError, TypeError) as e:
+            logger.warning(
+                "Tags inválidos en la transacción %s, se omiten: %s", transaction_id, e
+            )
+
+    if rows:
+        connection.execute(insert(TransactionTag), rows)
+        logger.info("Tags de transacciones migrados: %s", len(rows))
+
+
+# Pasos en orden: el paso N lleva la base de la versión N a la N + 1
+_STEPS: List[Callable[[Connection], None]] = [
+    _create_model_indexes,
+    _backfill_transaction_tags,
+]
+
+SCHEMA_VERSION = len(_STEPS)
+
+
+def upgrade_schema(engine: Engine, existing_tables: Set[str]) -> None:
+    """
+    Aplicar las migraciones pendientes y registrar la versión del esquema.
+
+    Args:
+        engine: Engine de la base de datos
+        existing_tables: Tablas existentes antes de inicializar el esquema
+    """
+    with engine.begin() as connection:
+        version = connection.execute(select(SchemaVersion.version)).scalar()
+        if version is None:
+            # Base nueva: `create_all` ya creó el esquema actual completo
+            version = 0 if "transactions" in existing_tables else SCHEMA_VERSION
+        elif version >= SCHEMA_VERSION:
+            return
+
+        for step in _STEPS[version:]:
+            step(connection)
+            logger.info("Migración de esquema aplicada: %s", step.__name__)
+
+        connection.execute(delete(SchemaVersion))
+        connection.execute(insert(SchemaVersion), {'version': SCHEMA_VERSION})
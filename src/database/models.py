@@ -3,38 +3,53 @@
 from __future__ import annotations
 
 import json
-from datetime import datetime
 from decimal import Decimal
 from enum import Enum
-from typing import Optional, List
+from typing import Final, Optional, List
 
 from sqlalchemy import (
     Boolean,
     Column,
     DateTime,
     ForeignKey,
+    Index,
     Integer,
     Numeric,
     String,
     Text,
     UniqueConstraint,
+    func,
+    true,
 )
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, validates
 from sqlalchemy.ext.hybrid import hybrid_property
 
+try:
+    from enum import StrEnum
+except ImportError:  # Python < 3.11
+    class StrEnum(str, Enum):
+        """Compatibilidad con `enum.StrEnum` para Python < 3.11."""
+
+        def __str__(self) -> str:
+            return str(self.value)
+
 # Base para todos los modelos
 Base = declarative_base()
 
+# Los timestamps los calcula la base de datos (CURRENT_TIMESTAMP, en UTC). Además
+# de `server_default`, el INSERT incluye `now()` explícitamente: las tablas creadas
+# antes de `server_default` no tienen ese DEFAULT y create_all no las altera.
+
 
-class TransactionType(str, Enum):
+class TransactionType(StrEnum):
     """Tipos de transacción."""
     INCOME = "income"
     EXPENSE = "expense"
     TRANSFER = "transfer"
 
 
-class InvestmentType(str, Enum):
+class InvestmentType(StrEnum):
     """Tipos de inversión."""
     STOCK = "stock"
     BOND = "bond"
@@ -44,7 +59,7 @@ class InvestmentType(str, Enum):
     OTHER = "other"
 
 
-class PaymentMethod(str, Enum):
+class PaymentMethod(StrEnum):
     """Métodos de pago."""
     CASH = "cash"
     CREDIT_CARD = "credit_card"
@@ -54,7 +69,7 @@ class PaymentMethod(str, Enum):
     OTHER = "other"
 
 
-class RecurrenceFrequency(str, Enum):
+class RecurrenceFrequency(StrEnum):
     """Frecuencias de recurrencia."""
     DAILY = "daily"
     WEEKLY = "weekly"
@@ -63,6 +78,10 @@ class RecurrenceFrequency(str, Enum):
     YEARLY = "yearly"
 
 
+# Valores válidos de método de pago para chequeos de pertenencia O(1)
+_PAYMENT_METHODS: Final[frozenset[str]] = frozenset(m.value for m in PaymentMethod)
+
+
 class Category(Base):
     """Modelo para categorías de transacciones."""
 
@@ -74,8 +93,12 @@ class Category(Base):
     color = Column(String(7), default="#6B7280")  # Color hex
     icon = Column(String(50), default="💰")
     is_active = Column(Boolean, default=True)
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)    # Relaciones
+    created_at = Column(DateTime, default=func.now(), server_default=func.now())
+    updated_at = Column(
+        DateTime, default=func.now(), server_default=func.now(), onupdate=func.now()
+    )
+
+    # Relaciones
     transactions = relationship("Transaction", back_populates="category")
 
     def __repr__(self) -> str:
@@ -95,8 +118,10 @@ class Account(Base):
     closing_day = Column(Integer)  # Día de cierre (1-31)
     due_day = Column(Integer)  # Día de vencimiento (1-31)
     is_active = Column(Boolean, default=True)
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = Column(DateTime, default=func.now(), server_default=func.now())
+    updated_at = Column(
+        DateTime, default=func.now(), server_default=func.now(), onupdate=func.now()
+    )
 
     # Relaciones
     transactions = relationship("Transaction", back_populates="account")
@@ -114,28 +139,50 @@ class Transaction(Base):
     amount = Column(Numeric(10, 2), nullable=False)
     description = Column(String(500), nullable=False)
     transaction_type = Column(String(20), nullable=False)  # income, expense, transfer
-    payment_method = Column(String(50), default=PaymentMethod.CASH)
-    transaction_date = Column(DateTime, nullable=False, index=True)
+    payment_method = Column(String(50), default=PaymentMethod.CASH.value)
+    transaction_date = Column(DateTime, nullable=False)
 
     # Claves foráneas
     category_id = Column(String(36), ForeignKey("categories.id"))
     account_id = Column(String(36), ForeignKey("accounts.id"))
 
     # Campos adicionales
-    tags = Column(Text)  # JSON array as string
+    tags = Column(Text)  # JSON array as string (para mostrar; se filtra por transaction_tags)
     location = Column(String(200))
     notes = Column(Text)
     is_recurring = Column(Boolean, default=False)
     recurring_id = Column(Integer, ForeignKey("recurring_transactions.id"))
 
     # Timestamps
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = Column(DateTime, default=func.now(), server_default=func.now())
+    updated_at = Column(
+        DateTime, default=func.now(), server_default=func.now(), onupdate=func.now()
+    )
 
     # Relaciones
     category = relationship("Category", back_populates="transactions")
     account = relationship("Account", back_populates="transactions")
     recurring_transaction = relationship("RecurringTransaction", back_populates="transactions")
+    tag_links = relationship(
+        "TransactionTag",
+        back_populates="transaction",
+        cascade="all, delete-orphan",
+        passive_deletes=True,  # La base de datos elimina los tags (ON DELETE CASCADE)
+    )
+
+    # Índices para el análisis de presupuestos (categoría + tipo + rango de fechas),
+    # los filtros por categoría o cuenta con rango de fechas y los resúmenes por
+    # período, que el índice cubre sin leer la tabla (su prefijo fecha + tipo
+    # sirve también a los filtros por rango y tipo)
+    __table_args__ = (
+        Index('ix_txn_cat_type_date', 'category_id', 'transaction_type', 'transaction_date'),
+        Index('ix_txn_cat_date', 'category_id', 'transaction_date'),
+        Index('ix_txn_acc_date', 'account_id', 'transaction_date'),
+        Index(
+            'ix_txn_date_type_cat_amount',
+            'transaction_date', 'transaction_type', 'category_id', 'amount'
+        ),
+    )
 
     @hybrid_property
     def parsed_tags(self) -> Optional[List[str]]:
@@ -149,10 +196,39 @@ class Transaction(Base):
         """Permite filtrar por tags en consultas."""
         return cls.tags
 
+    @validates("payment_method")
+    def validate_payment_method(self, key: str, value: Optional[str]) -> Optional[str]:
+        """Rechazar métodos de pago que no estén en PaymentMethod."""
+        if value is not None and value not in _PAYMENT_METHODS:
+            raise ValueError(f"Método de pago inválido: {value}")
+        return value
+
     def __repr__(self) -> str:
         return f"<Transaction(amount={self.amount}, type='{self.transaction_type}')>"
 
 
+class TransactionTag(Base):
+    """Modelo para los tags de cada transacción (uno por fila, para filtrar por índice)."""
+
+    __tablename__ = "transaction_tags"
+
+    transaction_id = Column(
+        String(36), ForeignKey("transactions.id", ondelete="CASCADE"), primary_key=True
+    )
+    tag = Column(String(100), primary_key=True)
+
+    # Relaciones
+    transaction = relationship("Transaction", back_populates="tag_links")
+
+    # Índice para buscar transacciones por tag
+    __table_args__ = (
+        Index('ix_transaction_tags_tag', 'tag', 'transaction_id'),
+    )
+
+    def __repr__(self) -> str:
+        return f"<TransactionTag(transaction_id='{self.transaction_id}', tag='{self.tag}')>"
+
+
 class RecurringTransaction(Base):
     """Modelo para transacciones recurrentes."""
 
@@ -177,8 +253,10 @@ class RecurringTransaction(Base):
     auto_execute = Column(Boolean, default=False)
 
     # Timestamps
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = Column(DateTime, default=func.now(), server_default=func.now())
+    updated_at = Column(
+        DateTime, default=func.now(), server_default=func.now(), onupdate=func.now()
+    )
 
     # Relaciones
     transactions = relationship("Transaction", back_populates="recurring_transaction")
@@ -203,13 +281,30 @@ class Budget(Base):
     is_active = Column(Boolean, default=True)
 
     # Timestamps
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = Column(DateTime, default=func.now(), server_default=func.now())
+    updated_at = Column(
+        DateTime, default=func.now(), server_default=func.now(), onupdate=func.now()
+    )
 
     # Relaciones
-    budget_categories = relationship("BudgetCategory", back_populates="budget", cascade="all, delete-orphan")    # Constraint único por período
+    budget_categories = relationship(
+        "BudgetCategory",
+        back_populates="budget",
+        cascade="all, delete-orphan",
+        passive_deletes=True,  # La base de datos elimina las categorías (ON DELETE CASCADE)
+    )
+
+    # Constraint único por período e índice parcial de presupuestos activos,
+    # en el mismo orden que `get_budgets` para evitar el paso de ordenamiento
     __table_args__ = (
         UniqueConstraint('period_type', 'year', 'month', name='uq_budget_period'),
+        Index(
+            'ix_budget_active_year_month',
+            year.desc(),
+            month.desc(),
+            sqlite_where=is_active == true(),  # SQLite solo usa el índice con `= 1`
+            postgresql_where=is_active,
+        ),
     )
 
     def __repr__(self) -> str:
@@ -222,14 +317,16 @@ class BudgetCategory(Base):
     __tablename__ = "budget_categories"
 
     id = Column(String(36), primary_key=True, index=True)  # UUID
-    budget_id = Column(String(36), ForeignKey("budgets.id"), nullable=False)
+    budget_id = Column(String(36), ForeignKey("budgets.id", ondelete="CASCADE"), nullable=False)
     category_id = Column(String(36), ForeignKey("categories.id"), nullable=False)
     allocated_amount = Column(Numeric(10, 2), nullable=False)
     description = Column(Text)
 
     # Timestamps
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = Column(DateTime, default=func.now(), server_default=func.now())
+    updated_at = Column(
+        DateTime, default=func.now(), server_default=func.now(), onupdate=func.now()
+    )
 
     # Relaciones
     budget = relationship("Budget", back_populates="budget_categories")
@@ -262,12 +359,24 @@ class Investment(Base):
 
     # Estado
     is_active = Column(Boolean, default=True)    # Timestamps
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = Column(DateTime, default=func.now(), server_default=func.now())
+    updated_at = Column(
+        DateTime, default=func.now(), server_default=func.now(), onupdate=func.now()
+    )
 
     # Relaciones
     dividends = relationship("Dividend", back_populates="investment")
 
+    # Índice parcial de inversiones activas, ordenado como `get_investments`
+    __table_args__ = (
+        Index(
+            'ix_investment_active_pdate',
+            purchase_date.desc(),
+            sqlite_where=is_active == true(),  # SQLite solo usa el índice con `= 1`
+            postgresql_where=is_active,
+        ),
+    )
+
     def __repr__(self) -> str:
         return f"<Investment(name='{self.name}', type='{self.investment_type}', value={self.current_value})>"
 
@@ -286,7 +395,7 @@ class Dividend(Base):
     notes = Column(Text)
 
     # Timestamps
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, default=func.now(), server_default=func.now())
 
     # Relaciones
     investment = relationship("Investment", back_populates="dividends")
@@ -312,8 +421,21 @@ class Goal(Base):
     priority = Column(Integer, default=1)  # 1=alta, 2=media, 3=baja
 
     # Timestamps
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = Column(DateTime, default=func.now(), server_default=func.now())
+    updated_at = Column(
+        DateTime, default=func.now(), server_default=func.now(), onupdate=func.now()
+    )
 
     def __repr__(self) -> str:
         return f"<Goal(name='{self.name}', target={self.target_amount})>"
+
+
+class SchemaVersion(Base):
+    """Versión de esquema aplicada (una sola fila), usada por las migraciones de inicio."""
+
+    __tablename__ = "schema_version"
+
+    version = Column(Integer, primary_key=True)
+
+    def __repr__(self) -> str:
+        return f"<SchemaVersion(version={self.version})>"
@@ -0,0 +1,130 @@
+"""Búsqueda de texto completo sobre descripción y notas de transacciones."""
+
+from __future__ import annotations
+
+from typing import Optional, Set
+
+from sqlalchemy import ColumnElement, func, literal_column, or_, select, table
+from sqlalchemy.engine import Engine
+
+from src.database.models import Transaction
+from src.utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Tabla FTS5 de contenido externo: indexa las columnas de `transactions` por
+# rowid sin duplicar el texto. Tras un VACUUM (que puede renumerar los rowid)
+# debe reconstruirse con `rebuild_search_index`.
+SQLITE_SEARCH_TABLE = "transactions_fts"
+
+_SQLITE_SEARCH_DDL = (
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {SQLITE_SEARCH_TABLE} USING fts5(
+        description, notes, content='transactions', content_rowid='rowid'
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS transactions_fts_ai AFTER INSERT ON transactions BEGIN
+        INSERT INTO {SQLITE_SEARCH_TABLE}(rowid, description, notes)
+        VALUES (new.rowid, new.description, new.notes);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS transactions_fts_ad AFTER DELETE ON transactions BEGIN
+        INSERT INTO {SQLITE_SEARCH_TABLE}({SQLITE_SEARCH_TABLE}, rowid, description, notes)
+        VALUES ('delete', old.rowid, old.description, old.notes);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS transactions_fts_au
+    AFTER UPDATE OF description, notes ON transactions BEGIN
+        INSERT INTO {SQLITE_SEARCH_TABLE}({SQLITE_SEARCH_TABLE}, rowid, description, notes)
+        VALUES ('delete', old.rowid, old.description, old.notes);
+        INSERT INTO {SQLITE_SEARCH_TABLE}(rowid, description, notes)
+        VALUES (new.rowid, new.description, new.notes);
+    END""",
+)
+
+# En PostgreSQL basta un índice GIN sobre la misma expresión que usa la búsqueda
+_POSTGRESQL_SEARCH_DDL = (
+    """CREATE INDEX IF NOT EXISTS ix_txn_search ON transactions
+    USING gin (to_tsvector('simple', description || ' ' || coalesce(notes, '')))""",
+)
+
+_SEARCH_TABLE = table(SQLITE_SEARCH_TABLE)
+_TRANSACTION_ROWID = literal_column("transactions.rowid")
+
+
+def create_search_index(engine: Engine, existing_tables: Set[str]) -> None:
+    """
+    Crear el índice de texto completo si el dialecto lo soporta y aún no existe.
+
+    Args:
+        engine: Engine de la base de datos
+        existing_tables: Tablas existentes antes de inicializar el esquema
+    """
+    dialect = engine.dialect.name
+    if dialect == "sqlite":
+        if SQLITE_SEARCH_TABLE in existing_tables and "transactions" in existing_tables:
+            return
+        statements = _SQLITE_SEARCH_DDL
+    elif dialect == "postgresql":
+        statements = _POSTGRESQL_SEARCH_DDL
+    else:
+        return
+
+    with engine.begin() as connection:
+        for statement in statements:
+            connection.exec_driver_sql(statement)
+
+    # Indexar las transacciones que existían antes de crear la tabla FTS
+    if dialect == "sqlite":
+        rebuild_search_index(engine)
+    logger.debug("Índice de búsqueda de texto completo creado")
+
+
+def drop_search_index(engine: Engine) -> None:
+    """Eliminar la tabla FTS de SQLite (los triggers se eliminan con `transactions`)."""
+    if engine.dialect.name == "sqlite":
+        with engine.begin() as connection:
+            connection.exec_driver_sql(f"DROP TABLE IF EXISTS {SQLITE_SEARCH_TABLE}")
+
+
+def rebuild_search_index(engine: Engine) -> None:
+    """Reconstruir la tabla FTS de SQLite a partir de `transactions`."""
+    if engine.dialect.name == "sqlite":
+        with engine.begin() as connection:
+            connection.exec_driver_sql(
+                f"INSERT INTO {SQLITE_SEARCH_TABLE}({SQLITE_SEARCH_TABLE}) VALUES ('rebuild')"
+            )
+
+
+def search_condition(dialect: str, search_text: str) -> Optional[ColumnElement[bool]]:
+    """
+    Construir la condición de búsqueda de texto sobre descripción y notas.
+
+    En SQLite cada palabra se busca como prefijo en la tabla FTS5; en
+    PostgreSQL se usa el índice GIN con `websearch_to_tsquery`. El resto de
+    dialectos recurre a ILIKE sobre ambas columnas.
+
+    Returns:
+        Condición para el WHERE, o None si el texto no contiene palabras
+    """
+    words = search_text.split()
+    if not words:
+        return None
+
+    if dialect == "sqlite":
+        # Cada palabra entre comillas (escapando las comillas) y como prefijo
+        match_query = " ".join('"{}"*'.format(word.replace('"', '""')) for word in words)
+        return _TRANSACTION_ROWID.in_(
+            select(literal_column("rowid"))
+            .select_from(_SEARCH_TABLE)
+            .where(literal_column(SQLITE_SEARCH_TABLE).op("MATCH")(match_query))
+        )
+
+    if dialect == "postgresql":
+        document = func.to_tsvector(
+            "simple",
+            Transaction.description + " " + func.coalesce(Transaction.notes, "")
+        )
+        return document.bool_op("@@")(func.websearch_to_tsquery("simple", search_text))
+
+    search_pattern = f"%{search_text}%"
+    return or_(
+        Transaction.description.ilike(search_pattern),
+        Transaction.notes.ilike(search_pattern)
+    )
@@ -0,0 +1,42 @@
+"""Sentencias INSERT ... ON CONFLICT compartidas por los servicios."""
+
+from __future__ import annotations
+
+from typing import Optional
+
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from src.database.models import Category
+from src.utils.ids import generate_id
+
+# Constructores de INSERT con soporte de ON CONFLICT ... RETURNING por dialecto
+_UPSERT_INSERTS = {'postgresql': pg_insert, 'sqlite': sqlite_insert}
+
+
+def upsert_category(session: Session, name: str) -> Optional[Category]:
+    """
+    Obtener o crear una categoría por nombre en un solo round trip.
+
+    Args:
+        session: Sesión de base de datos
+        name: Nombre de la categoría
+
+    Returns:
+        La categoría existente o recién creada, o None si el dialecto no
+        soporta ON CONFLICT (el llamador debe buscarla e insertarla)
+    """
+    insert = _UPSERT_INSERTS.get(session.get_bind().dialect.name)
+    if insert is None:
+        return None
+
+    # Sin carrera entre la búsqueda y la inserción: el conflicto por nombre
+    # se resuelve en la base de datos y RETURNING devuelve la fila en ambos casos
+    statement = (
+        insert(Category)
+        .values(id=generate_id(), name=name, description=f"Categoría {name}")
+        .on_conflict_do_update(index_elements=['name'], set_={'name': name})
+        .returning(Category)
+    )
+    return session.execute(statement).scalar_one()
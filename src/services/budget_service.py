@@ -2,20 +2,57 @@
 
 from __future__ import annotations
 
-from datetime import datetime, date
+import time
+from datetime import date
 from decimal import Decimal
-from typing import List, Optional, Dict, Any
-from uuid import uuid4
+from typing import List, NamedTuple, Optional, Dict, Any, Tuple
 
-from sqlalchemy.orm import Session
-from sqlalchemy import and_, func, extract
+from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import and_, bindparam, delete, func, extract, select, update
 
 from src.database.connection import create_db_session
 from src.database.models import Budget, BudgetCategory, Transaction, Category, TransactionType
+from src.database.upsert import upsert_category
+from src.utils.ids import generate_id
 from src.utils.logging import get_logger
 
 logger = get_logger(__name__)
 
+# Tipo de transacción comparado en cada análisis de presupuesto
+_EXPENSE = TransactionType.EXPENSE
+
+# Campos que se pueden modificar en un presupuesto existente
+_UPDATABLE_FIELDS = frozenset({'name', 'description', 'is_active'})
+
+# Vigencia (segundos) y tamaño máximo de la cache de presupuesto actual
+_CURRENT_BUDGET_TTL = 5.0
+_CURRENT_BUDGET_CACHE_SIZE = 32
+
+# Consultas construidas una sola vez; en cada llamada solo cambian los parámetros
+_ALL_BUDGETS = select(Budget).order_by(Budget.year.desc(), Budget.month.desc())
+_ACTIVE_BUDGETS = _ALL_BUDGETS.where(Budget.is_active)
+_CURRENT_MONTHLY_BUDGET = select(Budget).where(
+    Budget.is_active,
+    Budget.year == bindparam('year'),
+    Budget.month == bindparam('month')
+).limit(1)
+_CURRENT_YEARLY_BUDGET = select(Budget).where(
+    Budget.is_active,
+    Budget.year == bindparam('year'),
+    Budget.month.is_(None)
+).limit(1)
+
+
+class CategoryAnalysis(NamedTuple):
+    """Análisis de una categoría de presupuesto (`_asdict()` si se requiere un dict)."""
+
+    category_name: str
+    allocated_amount: Decimal
+    spent_amount: Decimal
+    remaining_amount: Decimal
+    percentage_used: float
+    is_over_budget: bool
+
 
 class BudgetService:
     """Servicio para gestión de presupuestos."""
@@ -23,6 +60,11 @@ class BudgetService:
     def __init__(self, db_session: Optional[Session] = None):
         """Inicializar servicio de presupuestos."""
         self._db_session = db_session
+        self._category_cache: Dict[str, Category] = {}
+        self._current_budget_cache: Dict[
+            Tuple[int, Optional[int]], Tuple[float, Optional[Budget]]
+        ] = {}
+
     @property
     def db_session(self) -> Session:
         """Obtener sesión de base de datos."""
@@ -41,25 +83,25 @@ class BudgetService:
         """Crear nuevo presupuesto."""
         try:
             budget = Budget(
-                id=str(uuid4()),
+                id=generate_id(),
                 name=name,
                 period_type=period_type,
                 year=year,
                 month=month,
                 description=description,
-                is_active=True,
-                created_at=datetime.now()
+                is_active=True
             )
 
             self.db_session.add(budget)
             self.db_session.commit()
+            self._current_budget_cache.clear()
 
-            logger.info(f"Presupuesto creado: {budget.id} - {name}")
+            logger.info("Presupuesto creado: %s - %s", budget.id, name)
             return budget
 
         except Exception as e:
             self.db_session.rollback()
-            logger.error(f"Error al crear presupuesto: {e}")
+            logger.error("Error al crear presupuesto: %s", e)
             raise
 
     def add_budget_category(
@@ -75,68 +117,129 @@ class BudgetService:
             category = self._get_or_create_category(category_name)
 
             budget_category = BudgetCategory(
-                id=str(uuid4()),
+                id=generate_id(),
                 budget_id=budget_id,
                 category_id=category.id,
                 allocated_amount=allocated_amount,
-                description=description,
-                created_at=datetime.now()
+                description=description
             )
 
             self.db_session.add(budget_category)
             self.db_session.commit()
 
-            logger.info(f"Categoría agregada al presupuesto: {category_name} - {allocated_amount}")
+            logger.info("Categoría agregada al presupuesto: %s - %s", category_name, allocated_amount)
             return budget_category
 
         except Exception as e:
             self.db_session.rollback()
-            logger.error(f"Error al agregar categoría al presupuesto: {e}")
+            self._category_cache.clear()
+            logger.error("Error al agregar categoría al presupuesto: %s", e)
             raise
 
-    def get_budgets(self, active_only: bool = True) -> List[Budget]:
-        """Obtener presupuestos."""
+    def add_budget_categories(
+        self,
+        budget_id: str,
+        items: List[Tuple[str, Decimal, Optional[str]]]
+    ) -> List[BudgetCategory]:
+        """
+        Agregar varias categorías a un presupuesto con un único commit.
+
+        Args:
+            budget_id: ID del presupuesto
+            items: Tuplas (nombre de categoría, monto asignado, descripción)
+
+        Returns:
+            Lista de categorías de presupuesto creadas
+        """
         try:
-            query = self.db_session.query(Budget)
+            # Resolver todas las categorías existentes en una sola consulta
+            names = list(dict.fromkeys(name for name, _, _ in items))
+            categories = {
+                category.name: category
+                for category in self.db_session.query(Category).filter(
+                    Category.name.in_(names)
+                ).all()
+            }
 
-            if active_only:
-                query = query.filter(Budget.is_active == True)
+            new_categories = [
+                Category(
+                    id=generate_id(),
+                    name=name,
+                    description=f"Categoría {name}"
+                )
+                for name in names
+                if name not in categories
+            ]
+            categories.update((category.name, category) for category in new_categories)
+
+            budget_categories = [
+                BudgetCategory(
+                    id=generate_id(),
+                    budget_id=budget_id,
+                    category_id=categories[name].id,
+                    allocated_amount=allocated_amount,
+                    description=description
+                )
+                for name, allocated_amount, description in items
+            ]
 
-            return query.order_by(Budget.year.desc(), Budget.month.desc()).all()
+            self.db_session.add_all(new_categories)
+            self.db_session.add_all(budget_categories)
+            self.db_session.commit()
+            self._category_cache.update(categories)
+
+            logger.info("Categorías agregadas al presupuesto %s: %s", budget_id, len(budget_categories))
+            return budget_categories
 
         except Exception as e:
-            logger.error(f"Error al obtener presupuestos: {e}")
+            self.db_session.rollback()
+            self._category_cache.clear()
+            logger.error("Error al agregar categorías al presupuesto: %s", e)
+            raise
+
+    def get_budgets(self, active_only: bool = True) -> List[Budget]:
+        """Obtener presupuestos."""
+        try:
+            statement = _ACTIVE_BUDGETS if active_only else _ALL_BUDGETS
+            return self.db_session.execute(statement).scalars().all()
+
+        except Exception as e:
+            logger.error("Error al obtener presupuestos: %s", e)
             raise
 
     def get_budget_by_id(self, budget_id: str) -> Optional[Budget]:
         """Obtener presupuesto por ID."""
         try:
-            return self.db_session.query(Budget).filter(
-                Budget.id == budget_id
-            ).first()
+            return self.db_session.get(Budget, budget_id)
         except Exception as e:
-            logger.error(f"Error al obtener presupuesto {budget_id}: {e}")
+            logger.error("Error al obtener presupuesto %s: %s", budget_id, e)
             raise
 
     def get_current_budget(self, year: int, month: Optional[int] = None) -> Optional[Budget]:
-        """Obtener presupuesto actual."""
+        """Obtener presupuesto actual (cacheado durante `_CURRENT_BUDGET_TTL` segundos)."""
         try:
-            query = self.db_session.query(Budget).filter(
-                and_(
-                    Budget.year == year,
-                    Budget.is_active == True
-                )
-            )
+            key = (year, month or None)
+            now = time.monotonic()
+            cached = self._current_budget_cache.get(key)
+            if cached is not None and now - cached[0] < _CURRENT_BUDGET_TTL:
+                return cached[1]
 
             if month:
-                query = query.filter(Budget.month == month)
+                result = self.db_session.execute(
+                    _CURRENT_MONTHLY_BUDGET, {'year': year, 'month': month}
+                )
             else:
-                query = query.filter(Budget.month.is_(None))
+                result = self.db_session.execute(_CURRENT_YEARLY_BUDGET, {'year': year})
 
-            return query.first()
+            budget = result.scalars().first()
+
+            if len(self._current_budget_cache) >= _CURRENT_BUDGET_CACHE_SIZE:
+                self._current_budget_cache.clear()
+            self._current_budget_cache[key] = (now, budget)
+            return budget
 
         except Exception as e:
-            logger.error(f"Error al obtener presupuesto actual: {e}")
+            logger.error("Error al obtener presupuesto actual: %s", e)
             raise
 
     def get_budget_analysis(self, budget_id: str) -> Dict[str, Any]:
@@ -146,9 +249,10 @@ class BudgetService:
             if not budget:
                 raise ValueError(f"Presupuesto no encontrado: {budget_id}")
 
-            # Obtener categorías del presupuesto
+            # Obtener categorías del presupuesto (con su nombre en el mismo SELECT)
             budget_categories = (
                 self.db_session.query(BudgetCategory)
+                .options(joinedload(BudgetCategory.category))
                 .filter(BudgetCategory.budget_id == budget_id)
                 .all()
             )
@@ -164,38 +268,46 @@ class BudgetService:
                 start_date = date(budget.year, 1, 1)
                 end_date = date(budget.year + 1, 1, 1)
 
+            # Gastos reales de todas las categorías en una sola consulta
+            spent_by_category = dict(
+                self.db_session.query(
+                    Transaction.category_id,
+                    func.sum(Transaction.amount)
+                )
+                .filter(
+                    and_(
+                        Transaction.category_id.in_(
+                            [bc.category_id for bc in budget_categories]
+                        ),
+                        Transaction.transaction_type == _EXPENSE,
+                        Transaction.transaction_date >= start_date,
+                        Transaction.transaction_date < end_date
+                    )
+                )
+                .group_by(Transaction.category_id)
+                .all()
+            ) if budget_categories else {}
+
             # Analizar cada categoría
-            category_analysis = []
+            category_analysis: List[CategoryAnalysis] = []
             total_allocated = Decimal('0')
             total_spent = Decimal('0')
 
             for budget_cat in budget_categories:
-                # Obtener gastos reales de la categoría
-                spent_amount = (
-                    self.db_session.query(func.sum(Transaction.amount))
-                    .filter(
-                        and_(
-                            Transaction.category_id == budget_cat.category_id,
-                            Transaction.transaction_type == TransactionType.EXPENSE,
-                            Transaction.transaction_date >= start_date,
-                            Transaction.transaction_date < end_date
-                        )
-                    )
-                    .scalar()
-                ) or Decimal('0')
+                spent_amount = spent_by_category.get(budget_cat.category_id) or Decimal('0')
 
                 allocated = budget_cat.allocated_amount
                 remaining = allocated - spent_amount
                 percentage_used = (spent_amount / allocated * 100) if allocated > 0 else 0
 
-                category_analysis.append({
-                    'category_name': budget_cat.category.name,
-                    'allocated_amount': allocated,
-                    'spent_amount': spent_amount,
-                    'remaining_amount': remaining,
-                    'percentage_used': float(percentage_used),
-                    'is_over_budget': spent_amount > allocated
-                })
+                category_analysis.append(CategoryAnalysis(
+                    category_name=budget_cat.category.name,
+                    allocated_amount=allocated,
+                    spent_amount=spent_amount,
+                    remaining_amount=remaining,
+                    percentage_used=float(percentage_used),
+                    is_over_budget=spent_amount > allocated
+                ))
 
                 total_allocated += allocated
                 total_spent += spent_amount
@@ -223,7 +335,7 @@ class BudgetService:
             }
 
         except Exception as e:
-            logger.error(f"Error al analizar presupuesto {budget_id}: {e}")
+            logger.error("Error al analizar presupuesto %s: %s", budget_id, e)
             raise
 
     def update_budget(self, budget_id: str, **kwargs) -> Optional[Budget]:
@@ -233,63 +345,98 @@ class BudgetService:
             if not budget:
                 return None
 
-            allowed_fields = ['name', 'description', 'is_active']
-
             for field, value in kwargs.items():
-                if field in allowed_fields and value is not None:
+                if field in _UPDATABLE_FIELDS and value is not None:
                     setattr(budget, field, value)
 
-            budget.updated_at = datetime.now()
             self.db_session.commit()
+            self._current_budget_cache.clear()
 
-            logger.info(f"Presupuesto actualizado: {budget_id}")
+            logger.info("Presupuesto actualizado: %s", budget_id)
             return budget
 
         except Exception as e:
             self.db_session.rollback()
-            logger.error(f"Error al actualizar presupuesto {budget_id}: {e}")
+            logger.error("Error al actualizar presupuesto %s: %s", budget_id, e)
+            raise
+
+    def update_budget_fields(self, budget_id: str, **kwargs) -> int:
+        """
+        Actualizar campos de un presupuesto con un único UPDATE, sin cargarlo.
+
+        Returns:
+            Número de filas actualizadas (0 si no existe o no hay cambios)
+        """
+        try:
+            values = {
+                field: value for field, value in kwargs.items()
+                if field in _UPDATABLE_FIELDS and value is not None
+            }
+            if not values:
+                return 0
+
+            result = self.db_session.execute(
+                update(Budget).where(Budget.id == budget_id).values(**values)
+            )
+            self.db_session.commit()
+            self._current_budget_cache.clear()
+
+            logger.info("Presupuesto actualizado: %s", budget_id)
+            return result.rowcount
+
+        except Exception as e:
+            self.db_session.rollback()
+            logger.error("Error al actualizar presupuesto %s: %s", budget_id, e)
             raise
 
     def delete_budget(self, budget_id: str) -> bool:
         """Eliminar presupuesto."""
         try:
-            budget = self.get_budget_by_id(budget_id)
-            if not budget:
+            # Categorías primero: las bases creadas antes del ON DELETE CASCADE
+            # de budget_categories rechazarían borrar el presupuesto
+            self.db_session.execute(
+                delete(BudgetCategory).where(BudgetCategory.budget_id == budget_id)
+            )
+            result = self.db_session.execute(
+                delete(Budget).where(Budget.id == budget_id)
+            )
+            if not result.rowcount:
+                self.db_session.rollback()
                 return False
 
-            # Eliminar categorías del presupuesto primero
-            self.db_session.query(BudgetCategory).filter(
-                BudgetCategory.budget_id == budget_id
-            ).delete()
-
-            # Eliminar presupuesto
-            self.db_session.delete(budget)
             self.db_session.commit()
+            self._current_budget_cache.clear()
 
-            logger.info(f"Presupuesto eliminado: {budget_id}")
+            logger.info("Presupuesto eliminado: %s", budget_id)
             return True
 
         except Exception as e:
             self.db_session.rollback()
-            logger.error(f"Error al eliminar presupuesto {budget_id}: {e}")
+            logger.error("Error al eliminar presupuesto %s: %s", budget_id, e)
             raise
 
     def _get_or_create_category(self, name: str) -> Category:
-        """Obtener o crear categoría."""
-        category = self.db_session.query(Category).filter(
-            Category.name == name
-        ).first()
-
-        if not category:
-            category = Category(
-                id=str(uuid4()),
-                name=name,
-                description=f"Categoría {name}",
-                created_at=datetime.now()
-            )
-            self.db_session.add(category)
-            self.db_session.flush()
+        """Obtener o crear categoría (cacheada por nombre durante la sesión)."""
+        category = self._category_cache.get(name)
+        if category is not None:
+            return category
+
+        category = upsert_category(self.db_session, name)
+        if category is None:
+            category = self.db_session.query(Category).filter(
+                Category.name == name
+            ).first()
+
+            if not category:
+                category = Category(
+                    id=generate_id(),
+                    name=name,
+                    description=f"Categoría {name}"
+                )
+                self.db_session.add(category)
+                self.db_session.flush()
 
+        self._category_cache[name] = category
         return category
 
     def close(self):
@@ -2,20 +2,47 @@
 
 from __future__ import annotations
 
+import math
+import sys
 from datetime import datetime, date
 from decimal import Decimal
-from typing import List, Optional, Dict, Any
-from uuid import uuid4
+from typing import List, NamedTuple, Optional, Dict, Any, Iterator
 
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, func, desc
+from sqlalchemy import and_, func, desc, select, update
 
 from src.database.connection import create_db_session
 from src.database.models import Investment, InvestmentType
+from src.utils.ids import generate_id
 from src.utils.logging import get_logger
 
 logger = get_logger(__name__)
 
+# Campos que se pueden modificar en una inversión existente
+_UPDATABLE_FIELDS = frozenset({
+    'name', 'current_value', 'shares', 'purchase_price',
+    'description', 'is_active'
+})
+
+# Mayor exponente con el que `math.expm1` no desborda el float
+_MAX_EXPONENT = math.log(sys.float_info.max)
+
+# Consultas construidas una sola vez, ordenadas por fecha de compra descendente
+_ALL_INVESTMENTS = select(Investment).order_by(desc(Investment.purchase_date))
+_ACTIVE_INVESTMENTS = _ALL_INVESTMENTS.where(Investment.is_active)
+
+
+class PerformanceEntry(NamedTuple):
+    """Entrada de ranking de rendimiento (`_asdict()` si se requiere un dict)."""
+
+    id: str
+    name: str
+    type: str
+    invested: Decimal
+    current_value: Decimal
+    return_amount: Decimal
+    return_percentage: float
+
 
 class InvestmentService:
     """Servicio para gestión de inversiones."""
@@ -44,7 +71,7 @@ class InvestmentService:
         """Crear nueva inversión."""
         try:
             investment = Investment(
-                id=str(uuid4()),
+                id=generate_id(),
                 name=name,
                 investment_type=investment_type,
                 initial_amount=initial_amount,
@@ -53,19 +80,18 @@ class InvestmentService:
                 purchase_price=purchase_price,
                 description=description,
                 purchase_date=purchase_date or datetime.now(),
-                is_active=True,
-                created_at=datetime.now()
+                is_active=True
             )
 
             self.db_session.add(investment)
             self.db_session.commit()
 
-            logger.info(f"Inversión creada: {investment.id} - {name}")
+            logger.info("Inversión creada: %s - %s", investment.id, name)
             return investment
 
         except Exception as e:
             self.db_session.rollback()
-            logger.error(f"Error al crear inversión: {e}")
+            logger.error("Error al crear inversión: %s", e)
             raise
 
     def get_investments(
@@ -75,28 +101,53 @@ class InvestmentService:
     ) -> List[Investment]:
         """Obtener inversiones."""
         try:
-            query = self.db_session.query(Investment)
-
-            if active_only:
-                query = query.filter(Investment.is_active == True)
+            statement = _ACTIVE_INVESTMENTS if active_only else _ALL_INVESTMENTS
 
             if investment_type:
-                query = query.filter(Investment.investment_type == investment_type)
+                statement = statement.where(Investment.investment_type == investment_type)
+
+            return self.db_session.execute(statement).scalars().all()
+
+        except Exception as e:
+            logger.error("Error al obtener inversiones: %s", e)
+            raise
+
+    def iter_investments(
+        self,
+        active_only: bool = True,
+        batch: int = 1000
+    ) -> Iterator[Investment]:
+        """
+        Recorrer inversiones en lotes sin materializar toda la lista.
+
+        Pensado para consumidores que recorren el resultado una sola vez
+        (por ejemplo exportaciones), manteniendo en memoria un lote a la vez.
 
-            return query.order_by(desc(Investment.purchase_date)).all()
+        Args:
+            active_only: Solo inversiones activas
+            batch: Cantidad de filas por lote
+
+        Yields:
+            Inversiones ordenadas por fecha de compra descendente
+        """
+        try:
+            statement = _ACTIVE_INVESTMENTS if active_only else _ALL_INVESTMENTS
+
+            # yield_per implica stream_results: se construye un lote de objetos a la vez
+            yield from self.db_session.execute(
+                statement, execution_options={'yield_per': batch}
+            ).scalars()
 
         except Exception as e:
-            logger.error(f"Error al obtener inversiones: {e}")
+            logger.error("Error al recorrer inversiones: %s", e)
             raise
 
     def get_investment_by_id(self, investment_id: str) -> Optional[Investment]:
         """Obtener inversión por ID."""
         try:
-            return self.db_session.query(Investment).filter(
-                Investment.id == investment_id
-            ).first()
+            return self.db_session.get(Investment, investment_id)
         except Exception as e:
-            logger.error(f"Error al obtener inversión {investment_id}: {e}")
+            logger.error("Error al obtener inversión %s: %s", investment_id, e)
             raise
 
     def update_investment_value(
@@ -113,16 +164,15 @@ class InvestmentService:
 
             investment.current_value = current_value
             investment.last_updated = update_date or datetime.now()
-            investment.updated_at = datetime.now()
 
             self.db_session.commit()
 
-            logger.info(f"Valor de inversión actualizado: {investment_id} - {current_value}")
+            logger.info("Valor de inversión actualizado: %s - %s", investment_id, current_value)
             return investment
 
         except Exception as e:
             self.db_session.rollback()
-            logger.error(f"Error al actualizar valor de inversión {investment_id}: {e}")
+            logger.error("Error al actualizar valor de inversión %s: %s", investment_id, e)
             raise
 
     def update_investment(self, investment_id: str, **kwargs) -> Optional[Investment]:
@@ -132,24 +182,46 @@ class InvestmentService:
             if not investment:
                 return None
 
-            allowed_fields = [
-                'name', 'current_value', 'shares', 'purchase_price',
-                'description', 'is_active'
-            ]
-
             for field, value in kwargs.items():
-                if field in allowed_fields and value is not None:
+                if field in _UPDATABLE_FIELDS and value is not None:
                     setattr(investment, field, value)
 
-            investment.updated_at = datetime.now()
             self.db_session.commit()
 
-            logger.info(f"Inversión actualizada: {investment_id}")
+            logger.info("Inversión actualizada: %s", investment_id)
             return investment
 
         except Exception as e:
             self.db_session.rollback()
-            logger.error(f"Error al actualizar inversión {investment_id}: {e}")
+            logger.error("Error al actualizar inversión %s: %s", investment_id, e)
+            raise
+
+    def update_investment_fields(self, investment_id: str, **kwargs) -> int:
+        """
+        Actualizar campos de una inversión con un único UPDATE, sin cargarla.
+
+        Returns:
+            Número de filas actualizadas (0 si no existe o no hay cambios)
+        """
+        try:
+            values = {
+                field: value for field, value in kwargs.items()
+                if field in _UPDATABLE_FIELDS and value is not None
+            }
+            if not values:
+                return 0
+
+            result = self.db_session.execute(
+                update(Investment).where(Investment.id == investment_id).values(**values)
+            )
+            self.db_session.commit()
+
+            logger.info("Inversión actualizada: %s", investment_id)
+            return result.rowcount
+
+        except Exception as e:
+            self.db_session.rollback()
+            logger.error("Error al actualizar inversión %s: %s", investment_id, e)
             raise
 
     def delete_investment(self, investment_id: str) -> bool:
@@ -162,20 +234,31 @@ class InvestmentService:
             self.db_session.delete(investment)
             self.db_session.commit()
 
-            logger.info(f"Inversión eliminada: {investment_id}")
+            logger.info("Inversión eliminada: %s", investment_id)
             return True
 
         except Exception as e:
             self.db_session.rollback()
-            logger.error(f"Error al eliminar inversión {investment_id}: {e}")
+            logger.error("Error al eliminar inversión %s: %s", investment_id, e)
             raise
 
     def get_portfolio_summary(self) -> Dict[str, Any]:
         """Obtener resumen del portafolio de inversiones."""
         try:
-            investments = self.get_investments(active_only=True)
+            # Totales por tipo agregados en la base de datos
+            by_type_rows = (
+                self.db_session.query(
+                    Investment.investment_type,
+                    func.count(Investment.id),
+                    func.sum(Investment.initial_amount),
+                    func.sum(Investment.current_value)
+                )
+                .filter(Investment.is_active)
+                .group_by(Investment.investment_type)
+                .all()
+            )
 
-            if not investments:
+            if not by_type_rows:
                 return {
                     'total_invested': Decimal('0'),
                     'current_value': Decimal('0'),
@@ -187,62 +270,82 @@ class InvestmentService:
                     'worst_performers': []
                 }
 
-            total_invested = sum(inv.initial_amount for inv in investments)
-            current_value = sum(inv.current_value for inv in investments)
+            by_type = {}
+            investments_count = 0
+            total_invested = Decimal('0')
+            current_value = Decimal('0')
+            for inv_type, count, invested, value in by_type_rows:
+                by_type[str(inv_type)] = {
+                    'count': count,
+                    'invested': invested,
+                    'current_value': value,
+                    'return': value - invested
+                }
+                investments_count += count
+                total_invested += invested
+                current_value += value
+
             total_return = current_value - total_invested
             return_percentage = (total_return / total_invested * 100) if total_invested > 0 else 0
 
-            # Agrupar por tipo
-            by_type = {}
-            for inv in investments:
-                inv_type = inv.investment_type.value
-                if inv_type not in by_type:
-                    by_type[inv_type] = {
-                        'count': 0,
-                        'invested': Decimal('0'),
-                        'current_value': Decimal('0'),
-                        'return': Decimal('0')
-                    }
-
-                by_type[inv_type]['count'] += 1
-                by_type[inv_type]['invested'] += inv.initial_amount
-                by_type[inv_type]['current_value'] += inv.current_value
-                by_type[inv_type]['return'] += (inv.current_value - inv.initial_amount)
-
-            # Calcular rendimiento por inversión
-            investments_with_return = []
-            for inv in investments:
-                return_amount = inv.current_value - inv.initial_amount
-                return_pct = (return_amount / inv.initial_amount * 100) if inv.initial_amount > 0 else 0
-
-                investments_with_return.append({
-                    'id': inv.id,
-                    'name': inv.name,
-                    'type': inv.investment_type.value,
-                    'invested': inv.initial_amount,
-                    'current_value': inv.current_value,
-                    'return_amount': return_amount,
-                    'return_percentage': float(return_pct)
-                })
-
-            # Ordenar por rendimiento
-            investments_with_return.sort(key=lambda x: x['return_percentage'], reverse=True)
+            # Solo se cargan las filas necesarias para los rankings
+            top_performers = [
+                self._performance_entry(inv)
+                for inv in self._get_ranked_investments(descending=True)
+            ]
+            worst_performers = []
+            if investments_count > 5:
+                worst_performers = [
+                    self._performance_entry(inv)
+                    for inv in reversed(self._get_ranked_investments(descending=False))
+                ]
 
             return {
                 'total_invested': total_invested,
                 'current_value': current_value,
                 'total_return': total_return,
                 'return_percentage': float(return_percentage),
-                'investments_count': len(investments),
+                'investments_count': investments_count,
                 'by_type': by_type,
-                'top_performers': investments_with_return[:5],
-                'worst_performers': investments_with_return[-5:] if len(investments_with_return) > 5 else []
+                'top_performers': top_performers,
+                'worst_performers': worst_performers
             }
 
         except Exception as e:
-            logger.error(f"Error al obtener resumen del portafolio: {e}")
+            logger.error("Error al obtener resumen del portafolio: %s", e)
             raise
 
+    def _get_ranked_investments(self, descending: bool, limit: int = 5) -> List[Investment]:
+        """Obtener inversiones activas ordenadas por rendimiento porcentual."""
+        return_ratio = func.coalesce(
+            (Investment.current_value - Investment.initial_amount)
+            / func.nullif(Investment.initial_amount, 0),
+            0
+        )
+        return (
+            self.db_session.query(Investment)
+            .filter(Investment.is_active)
+            .order_by(desc(return_ratio) if descending else return_ratio)
+            .limit(limit)
+            .all()
+        )
+
+    @staticmethod
+    def _performance_entry(inv: Investment) -> PerformanceEntry:
+        """Construir entrada de ranking de rendimiento para una inversión."""
+        return_amount = inv.current_value - inv.initial_amount
+        return_pct = (return_amount / inv.initial_amount * 100) if inv.initial_amount > 0 else 0
+
+        return PerformanceEntry(
+            id=inv.id,
+            name=inv.name,
+            type=str(inv.investment_type),
+            invested=inv.initial_amount,
+            current_value=inv.current_value,
+            return_amount=return_amount,
+            return_percentage=float(return_pct)
+        )
+
     def get_investment_performance(
         self,
         investment_id: str,
@@ -259,21 +362,29 @@ class InvestmentService:
             total_return = investment.current_value - investment.initial_amount
             return_percentage = (total_return / investment.initial_amount * 100) if investment.initial_amount > 0 else 0
 
-            # Calcular días de tenencia
-            holding_days = (datetime.now().date() - investment.purchase_date.date()).days
-
-            # Rendimiento anualizado (aproximado)
-            if holding_days > 0:
-                annualized_return = ((investment.current_value / investment.initial_amount) ** (365.25 / holding_days) - 1) * 100
-            else:
-                annualized_return = 0
+            # Calcular días de tenencia (cada fecha se obtiene una sola vez)
+            purchase_date = investment.purchase_date.date()
+            holding_days = (date.today() - purchase_date).days
+
+            # Rendimiento anualizado (aproximado, en float: solo se muestra)
+            annualized_return = 0.0
+            if holding_days > 0 and investment.initial_amount > 0:
+                ratio = float(investment.current_value) / float(investment.initial_amount)
+                if ratio > 0:
+                    # Una gran ganancia en pocos días no cabe en un float: se informa infinito
+                    exponent = math.log(ratio) * 365.25 / holding_days
+                    annualized_return = (
+                        math.expm1(exponent) * 100 if exponent < _MAX_EXPONENT else math.inf
+                    )
+                else:
+                    annualized_return = -100.0
 
             return {
                 'investment': {
                     'id': investment.id,
                     'name': investment.name,
-                    'type': investment.investment_type.value,
-                    'purchase_date': investment.purchase_date.date()
+                    'type': str(investment.investment_type),
+                    'purchase_date': purchase_date
                 },
                 'values': {
                     'initial_amount': investment.initial_amount,
@@ -284,13 +395,13 @@ class InvestmentService:
                 'performance': {
                     'total_return': total_return,
                     'return_percentage': float(return_percentage),
-                    'annualized_return': float(annualized_return) if holding_days > 0 else 0,
+                    'annualized_return': annualized_return,
                     'holding_days': holding_days
                 }
             }
 
         except Exception as e:
-            logger.error(f"Error al obtener rendimiento de inversión {investment_id}: {e}")
+            logger.error("Error al obtener rendimiento de inversión %s: %s", investment_id, e)
             raise
 
     def close(self):
@@ -2,20 +2,137 @@
 
 from __future__ import annotations
 
+import copy
+import heapq
 from datetime import datetime, date, timedelta
 from decimal import Decimal
-from typing import List, Optional, Dict, Any, Tuple
+from typing import Any, Callable, Dict, List, Optional, Tuple
 from calendar import monthrange
+from collections import defaultdict
+from operator import itemgetter
 
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, func, extract, desc
+from sqlalchemy import Date, and_, bindparam, case, func, extract, desc, select
 
 from src.database.connection import create_db_session
 from src.database.models import Transaction, Investment, Budget, Category, Account, TransactionType
+from src.utils.dates import day_end, day_start
 from src.utils.logging import get_logger
 
 logger = get_logger(__name__)
 
+# Resúmenes de transacciones por período, compartidos por el proceso y separados por
+# base de datos; TransactionService los invalida después de cada escritura confirmada
+_SUMMARY_CACHE_SIZE = 64
+_summary_cache: Dict[Tuple[Any, ...], Any] = {}
+
+
+def invalidate_report_cache() -> None:
+    """Descartar los resúmenes cacheados (llamar tras modificar transacciones)."""
+    _summary_cache.clear()
+
+# Nombre de categoría para agrupar gastos; las transacciones sin categoría van juntas
+_CATEGORY_NAME = func.coalesce(Category.name, "Sin categoría").label('category_name')
+
+# Consultas de reportes construidas una sola vez: en cada llamada solo cambian
+# los límites del período (`start` y `end`, ambos inclusivos)
+_IN_PERIOD = and_(
+    Transaction.transaction_date >= bindparam('start'),
+    Transaction.transaction_date <= bindparam('end')
+)
+_EXPENSE_IN_PERIOD = and_(_IN_PERIOD, Transaction.transaction_type == TransactionType.EXPENSE)
+_MONTH = extract('month', Transaction.transaction_date).label('month')
+_DAY = func.date(Transaction.transaction_date, type_=Date).label('day')
+
+_TOTALS_BY_TYPE = (
+    select(Transaction.transaction_type, func.sum(Transaction.amount), func.count(Transaction.id))
+    .where(_IN_PERIOD)
+    .group_by(Transaction.transaction_type)
+)
+
+_TOP_EXPENSE_CATEGORIES = (
+    select(_CATEGORY_NAME, func.sum(Transaction.amount).label('total'))
+    .outerjoin_from(Transaction, Category)
+    .where(_EXPENSE_IN_PERIOD)
+    .group_by(_CATEGORY_NAME)
+    .order_by(desc('total'))
+    .limit(5)
+)
+
+_MONTHLY_TOTALS_BY_TYPE = (
+    select(
+        _MONTH, Transaction.transaction_type,
+        func.sum(Transaction.amount), func.count(Transaction.id)
+    )
+    .where(_IN_PERIOD)
+    .group_by(_MONTH, Transaction.transaction_type)
+)
+
+_MONTHLY_EXPENSE_BY_CATEGORY = (
+    select(_MONTH, _CATEGORY_NAME, func.sum(Transaction.amount))
+    .outerjoin_from(Transaction, Category)
+    .where(_EXPENSE_IN_PERIOD)
+    .group_by(_MONTH, _CATEGORY_NAME)
+)
+
+_DAILY_TOTALS = (
+    select(
+        _DAY,
+        func.sum(case(
+            (Transaction.transaction_type == TransactionType.INCOME, Transaction.amount),
+            else_=0
+        )),
+        func.sum(case(
+            (Transaction.transaction_type == TransactionType.EXPENSE, Transaction.amount),
+            else_=0
+        )),
+        func.count(Transaction.id)
+    )
+    .where(_IN_PERIOD)
+    .group_by(_DAY)
+    .order_by(_DAY)
+)
+
+
+class _PeriodTotals:
+    """Acumulador de totales de transacciones de un período."""
+
+    __slots__ = ('income', 'expense', 'total_amount', 'count')
+
+    def __init__(self) -> None:
+        self.income = Decimal('0')
+        self.expense = Decimal('0')
+        self.total_amount = Decimal('0')
+        self.count = 0
+
+    def add(self, trans_type: str, total: Decimal, count: int) -> None:
+        """Sumar una fila agregada (tipo, total, cantidad)."""
+        if trans_type == TransactionType.INCOME:
+            self.income += total
+        elif trans_type == TransactionType.EXPENSE:
+            self.expense += total
+        self.total_amount += total
+        self.count += count
+
+    def to_summary(self, top_categories: List[Tuple[str, Decimal]]) -> Dict[str, Any]:
+        """Construir el diccionario de resumen usado por los reportes."""
+        return {
+            'income_total': self.income,
+            'expense_total': self.expense,
+            'net_amount': self.income - self.expense,
+            'transactions_count': self.count,
+            'average_transaction': self.total_amount / self.count if self.count else Decimal('0'),
+            'top_expense_categories': [
+                {'name': cat, 'amount': amount}
+                for cat, amount in top_categories
+            ]
+        }
+
+
+def _top_categories(expense_by_category: Dict[str, Decimal], limit: int = 5) -> List[Tuple[str, Decimal]]:
+    """Seleccionar las categorías con mayor gasto."""
+    return heapq.nlargest(limit, expense_by_category.items(), key=itemgetter(1))
+
 
 class ReportService:
     """Servicio para generación de reportes."""
@@ -23,6 +140,7 @@ class ReportService:
     def __init__(self, db_session: Optional[Session] = None):
         """Inicializar servicio de reportes."""
         self._db_session = db_session
+
     @property
     def db_session(self) -> Session:
         """Obtener sesión de base de datos."""
@@ -48,7 +166,7 @@ class ReportService:
             investments_data = self._get_investments_summary()
 
             # Generar análisis de tendencias
-            trends_data = self._get_monthly_trends(year, month)
+            trends_data = self._get_monthly_trends(year, month, transactions_data)
 
             return {
                 'period': {
@@ -66,7 +184,7 @@ class ReportService:
             }
 
         except Exception as e:
-            logger.error(f"Error al generar reporte mensual {year}-{month}: {e}")
+            logger.error("Error al generar reporte mensual %s-%s: %s", year, month, e)
             raise
 
     def generate_yearly_report(self, year: int) -> Dict[str, Any]:
@@ -75,28 +193,14 @@ class ReportService:
             start_date = date(year, 1, 1)
             end_date = date(year, 12, 31)
 
-            # Datos de transacciones anuales
-            transactions_data = self._get_transactions_summary(start_date, end_date)
-
-            # Análisis mensual del año
-            monthly_analysis = []
-            for month in range(1, 13):
-                month_start = date(year, month, 1)
-                _, last_day = monthrange(year, month)
-                month_end = date(year, month, last_day)
-
-                month_data = self._get_transactions_summary(month_start, month_end)
-                monthly_analysis.append({
-                    'month': month,
-                    'month_name': month_start.strftime('%B'),
-                    **month_data
-                })
+            # Resumen anual y análisis mensual a partir de las mismas consultas
+            transactions_data, monthly_analysis = self._get_yearly_summaries(year)
 
             # Datos de inversiones
             investments_data = self._get_investments_summary()
 
             # Análisis de crecimiento anual
-            growth_analysis = self._get_yearly_growth_analysis(year)
+            growth_analysis = self._get_yearly_growth_analysis(year, transactions_data)
 
             return {
                 'period': {
@@ -112,7 +216,7 @@ class ReportService:
             }
 
         except Exception as e:
-            logger.error(f"Error al generar reporte anual {year}: {e}")
+            logger.error("Error al generar reporte anual %s: %s", year, e)
             raise
 
     def generate_category_report(
@@ -125,8 +229,8 @@ class ReportService:
         try:
             query = self.db_session.query(Transaction).filter(
                 and_(
-                    Transaction.transaction_date >= start_date,
-                    Transaction.transaction_date <= end_date
+                    Transaction.transaction_date >= day_start(start_date),
+                    Transaction.transaction_date <= day_end(end_date)
                 )
             )
 
@@ -149,23 +253,21 @@ class ReportService:
             )
 
             # Organizar datos por categoría
-            categories = {}
+            categories = defaultdict(lambda: {
+                'income': Decimal('0'),
+                'expense': Decimal('0'),
+                'transactions_count': 0,
+                'average_transaction': Decimal('0')
+            })
             for cat_name, trans_type, total, count, average in category_analysis:
-                if cat_name not in categories:
-                    categories[cat_name] = {
-                        'name': cat_name,
-                        'income': Decimal('0'),
-                        'expense': Decimal('0'),
-                        'transactions_count': 0,
-                        'average_transaction': Decimal('0')
-                    }
+                cat_data = categories[cat_name]
 
                 if trans_type == TransactionType.INCOME:
-                    categories[cat_name]['income'] = total
+                    cat_data['income'] = total
                 elif trans_type == TransactionType.EXPENSE:
-                    categories[cat_name]['expense'] = total
+                    cat_data['expense'] = total
 
-                categories[cat_name]['transactions_count'] += count
+                cat_data['transactions_count'] += count
 
             # Calcular promedios y balances
             for cat_data in categories.values():
@@ -176,7 +278,7 @@ class ReportService:
 
             # Ordenar por gasto total
             categories_list = sorted(
-                categories.values(),
+                ({'name': cat_name, **cat_data} for cat_name, cat_data in categories.items()),
                 key=lambda x: x['expense'],
                 reverse=True
             )
@@ -198,7 +300,7 @@ class ReportService:
             }
 
         except Exception as e:
-            logger.error(f"Error al generar reporte de categorías: {e}")
+            logger.error("Error al generar reporte de categorías: %s", e)
             raise
 
     def generate_cash_flow_report(
@@ -213,23 +315,20 @@ class ReportService:
             if granularity not in ["daily", "weekly", "monthly"]:
                 raise ValueError("Granularidad debe ser: daily, weekly, monthly")
 
-            # Obtener transacciones del período
-            transactions = (
-                self.db_session.query(Transaction)
-                .filter(
-                    and_(
-                        Transaction.transaction_date >= start_date,
-                        Transaction.transaction_date <= end_date
-                    )
-                )
-                .order_by(Transaction.transaction_date)
-                .all()
+            # Totales por día agregados en SQL, ordenados por fecha
+            daily_totals = iter(
+                self.db_session.execute(
+                    _DAILY_TOTALS, {'start': day_start(start_date), 'end': day_end(end_date)}
+                ).all()
             )
+            day_row = next(daily_totals, None)
 
-            # Generar datos de flujo de efectivo
+            # Generar datos de flujo de efectivo en una sola pasada
             cash_flow_data = []
             current_date = start_date
             running_balance = Decimal('0')
+            total_income = Decimal('0')
+            total_expense = Decimal('0')
 
             while current_date <= end_date:
                 # Determinar período actual
@@ -247,24 +346,23 @@ class ReportService:
                         period_end = date(current_date.year, current_date.month + 1, 1) - timedelta(days=1)
                         next_date = date(current_date.year, current_date.month + 1, 1)
 
-                # Filtrar transacciones del período
-                period_transactions = [
-                    t for t in transactions
-                    if current_date <= t.transaction_date.date() <= period_end
-                ]
-
-                # Calcular totales del período
-                period_income = sum(
-                    t.amount for t in period_transactions
-                    if t.transaction_type == TransactionType.INCOME
-                )
-                period_expense = sum(
-                    t.amount for t in period_transactions
-                    if t.transaction_type == TransactionType.EXPENSE
-                )
-
+                # Acumular los días que caen dentro del período
+                period_income = Decimal('0')
+                period_expense = Decimal('0')
+                period_count = 0
+                while day_row is not None and day_row[0] <= period_end:
+                    _, day_income, day_expense, day_count = day_row
+                    period_income += day_income
+                    period_expense += day_expense
+                    period_count += day_count
+                    day_row = next(daily_totals, None)
+
+                # Totales del resumen acumulados en la misma pasada; el flujo
+                # neto total es el saldo final
                 period_net = period_income - period_expense
                 running_balance += period_net
+                total_income += period_income
+                total_expense += period_expense
 
                 cash_flow_data.append({
                     'period_start': current_date,
@@ -273,7 +371,7 @@ class ReportService:
                     'expense': period_expense,
                     'net_flow': period_net,
                     'running_balance': running_balance,
-                    'transactions_count': len(period_transactions)
+                    'transactions_count': period_count
                 })
 
                 current_date = next_date
@@ -286,65 +384,95 @@ class ReportService:
                 },
                 'cash_flow': cash_flow_data,
                 'summary': {
-                    'total_income': sum(cf['income'] for cf in cash_flow_data),
-                    'total_expense': sum(cf['expense'] for cf in cash_flow_data),
-                    'net_flow': sum(cf['net_flow'] for cf in cash_flow_data),
-                    'final_balance': cash_flow_data[-1]['running_balance'] if cash_flow_data else Decimal('0'),
+                    'total_income': total_income,
+                    'total_expense': total_expense,
+                    'net_flow': running_balance,
+                    'final_balance': running_balance,
                     'periods_count': len(cash_flow_data)
                 },
                 'generated_at': datetime.now()
             }
 
         except Exception as e:
-            logger.error(f"Error al generar reporte de flujo de efectivo: {e}")
+            logger.error("Error al generar reporte de flujo de efectivo: %s", e)
             raise
 
     def _get_transactions_summary(self, start_date: date, end_date: date) -> Dict[str, Any]:
-        """Obtener resumen de transacciones para un período."""
-        transactions = (
-            self.db_session.query(Transaction)
-            .filter(
-                and_(
-                    Transaction.transaction_date >= start_date,
-                    Transaction.transaction_date <= end_date
-                )
-            )
-            .all()
-        )
-
-        income_total = sum(
-            t.amount for t in transactions
-            if t.transaction_type == TransactionType.INCOME
-        )
-        expense_total = sum(
-            t.amount for t in transactions
-            if t.transaction_type == TransactionType.EXPENSE
+        """Obtener resumen de transacciones para un período (agregado en SQL, cacheado)."""
+        return self._cached(
+            ('summary', start_date, end_date),
+            lambda: self._compute_transactions_summary(start_date, end_date)
         )
 
-        # Top categorías de gastos
-        expense_by_category = {}
-        for t in transactions:
-            if t.transaction_type == TransactionType.EXPENSE:
-                cat_name = t.category.name if t.category else "Sin categoría"
-                expense_by_category[cat_name] = expense_by_category.get(cat_name, Decimal('0')) + t.amount
+    def _get_yearly_summaries(self, year: int) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+        """
+        Obtener resumen anual y desglose mensual con dos consultas agrupadas por mes.
+
+        Returns:
+            Tupla (resumen anual, lista de resúmenes de enero a diciembre)
+        """
+        return self._cached(('yearly', year), lambda: self._compute_yearly_summaries(year))
+
+    def _cached(self, key: Tuple[Any, ...], compute: Callable[[], Any]) -> Any:
+        """Devolver una copia del resultado cacheado para `key`, calculándolo si falta."""
+        key = (self.db_session.get_bind(), *key)
+        if key not in _summary_cache:
+            value = compute()
+            if len(_summary_cache) >= _SUMMARY_CACHE_SIZE:
+                _summary_cache.clear()
+            _summary_cache[key] = value
+        # Copia para que los reportes que modifiquen el resultado no alteren la caché
+        return copy.deepcopy(_summary_cache[key])
+
+    def _compute_transactions_summary(self, start_date: date, end_date: date) -> Dict[str, Any]:
+        """Calcular el resumen de transacciones de un período."""
+        period = {'start': day_start(start_date), 'end': day_end(end_date)}
+
+        # Totales y cantidad de transacciones por tipo
+        totals = _PeriodTotals()
+        for trans_type, total, count in self.db_session.execute(_TOTALS_BY_TYPE, period):
+            totals.add(trans_type, total, count)
+
+        # Top categorías de gastos (sin categoría se agrupa aparte)
+        top_categories = (
+            self.db_session.execute(_TOP_EXPENSE_CATEGORIES, period).all()
+        ) if totals.expense else []
+
+        return totals.to_summary(top_categories)
+
+    def _compute_yearly_summaries(self, year: int) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+        """Calcular el resumen anual y el desglose mensual."""
+        # Todo el año, hasta el último instante del 31 de diciembre
+        period = {'start': day_start(date(year, 1, 1)), 'end': day_end(date(year, 12, 31))}
+
+        # Totales por mes y tipo de transacción
+        totals_rows = self.db_session.execute(_MONTHLY_TOTALS_BY_TYPE, period).all()
+
+        # Gastos por mes y categoría
+        category_rows = self.db_session.execute(_MONTHLY_EXPENSE_BY_CATEGORY, period).all()
+
+        annual_totals = _PeriodTotals()
+        monthly_totals = {month: _PeriodTotals() for month in range(1, 13)}
+        for month, trans_type, total, count in totals_rows:
+            monthly_totals[int(month)].add(trans_type, total, count)
+            annual_totals.add(trans_type, total, count)
+
+        annual_categories: Dict[str, Decimal] = defaultdict(Decimal)
+        monthly_categories: Dict[int, Dict[str, Decimal]] = defaultdict(dict)
+        for month, cat_name, total in category_rows:
+            monthly_categories[int(month)][cat_name] = total
+            annual_categories[cat_name] += total
+
+        monthly_analysis = [
+            {
+                'month': month,
+                'month_name': date(year, month, 1).strftime('%B'),
+                **totals.to_summary(_top_categories(monthly_categories[month]))
+            }
+            for month, totals in monthly_totals.items()
+        ]
 
-        top_categories = sorted(
-            expense_by_category.items(),
-            key=lambda x: x[1],
-            reverse=True
-        )[:5]
-
-        return {
-            'income_total': income_total,
-            'expense_total': expense_total,
-            'net_amount': income_total - expense_total,
-            'transactions_count': len(transactions),
-            'average_transaction': sum(t.amount for t in transactions) / len(transactions) if transactions else Decimal('0'),
-            'top_expense_categories': [
-                {'name': cat, 'amount': amount}
-                for cat, amount in top_categories
-            ]
-        }
+        return annual_totals.to_summary(_top_categories(annual_categories)), monthly_analysis
 
     def _get_budget_analysis(self, year: int, month: int) -> Optional[Dict[str, Any]]:
         """Obtener análisis de presupuesto para un mes específico."""
@@ -360,7 +488,7 @@ class ReportService:
             return None
 
         except Exception as e:
-            logger.error(f"Error al obtener análisis de presupuesto: {e}")
+            logger.error("Error al obtener análisis de presupuesto: %s", e)
             return None
 
     def _get_investments_summary(self) -> Dict[str, Any]:
@@ -372,26 +500,32 @@ class ReportService:
             return investment_service.get_portfolio_summary()
 
         except Exception as e:
-            logger.error(f"Error al obtener resumen de inversiones: {e}")
+            logger.error("Error al obtener resumen de inversiones: %s", e)
             return {}
 
-    def _get_monthly_trends(self, year: int, month: int) -> Dict[str, Any]:
-        """Obtener tendencias mensuales."""
+    def _get_monthly_trends(
+        self,
+        year: int,
+        month: int,
+        current_data: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """Obtener tendencias mensuales (reutiliza el resumen del mes si ya se calculó)."""
         # Comparar con mes anterior
         if month == 1:
             prev_year, prev_month = year - 1, 12
         else:
             prev_year, prev_month = year, month - 1
 
-        current_start = date(year, month, 1)
-        _, current_last_day = monthrange(year, month)
-        current_end = date(year, month, current_last_day)
+        if current_data is None:
+            _, current_last_day = monthrange(year, month)
+            current_data = self._get_transactions_summary(
+                date(year, month, 1), date(year, month, current_last_day)
+            )
 
         prev_start = date(prev_year, prev_month, 1)
         _, prev_last_day = monthrange(prev_year, prev_month)
         prev_end = date(prev_year, prev_month, prev_last_day)
 
-        current_data = self._get_transactions_summary(current_start, current_end)
         prev_data = self._get_transactions_summary(prev_start, prev_end)
 
         # Calcular cambios porcentuales
@@ -421,18 +555,18 @@ class ReportService:
             }
         }
 
-    def _get_yearly_growth_analysis(self, year: int) -> Dict[str, Any]:
-        """Obtener análisis de crecimiento anual."""
+    def _get_yearly_growth_analysis(
+        self,
+        year: int,
+        current_data: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """Obtener análisis de crecimiento anual (reutiliza el resumen del año si ya se calculó)."""
         try:
             # Comparar con año anterior
-            current_start = date(year, 1, 1)
-            current_end = date(year, 12, 31)
-
-            prev_start = date(year - 1, 1, 1)
-            prev_end = date(year - 1, 12, 31)
+            if current_data is None:
+                current_data = self._get_transactions_summary(date(year, 1, 1), date(year, 12, 31))
 
-            current_data = self._get_transactions_summary(current_start, current_end)
-            prev_data = self._get_transactions_summary(prev_start, prev_end)
+            prev_data = self._get_transactions_summary(date(year - 1, 1, 1), date(year - 1, 12, 31))
 
             # Calcular tasas de crecimiento
             income_growth = self._calculate_percentage_change(
@@ -455,7 +589,7 @@ class ReportService:
             }
 
         except Exception as e:
-            logger.error(f"Error al obtener análisis de crecimiento: {e}")
+            logger.error("Error al obtener análisis de crecimiento: %s", e)
             return {}
 
     def _calculate_percentage_change(self, old_value: Decimal, new_value: Decimal) -> float:
@@ -5,18 +5,26 @@ from __future__ import annotations
 import json
 from datetime import datetime, date
 from decimal import Decimal
-from typing import List, Optional, Dict, Any
-from uuid import uuid4
-
-from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_, desc, asc, func, extract
-
-from src.database.connection import create_db_session
-from src.database.models import Transaction, Category, Account, TransactionType
+from typing import List, Optional, Dict, Any, Iterator
+
+from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import Row, and_, case, desc, asc, func, extract, insert, lambda_stmt, select, tuple_
+from sqlalchemy.sql.lambdas import StatementLambdaElement
+
+from src.database.connection import analyze_database, create_db_session
+from src.database.models import Transaction, TransactionTag, Category, Account, TransactionType
+from src.database.search import search_condition
+from src.database.upsert import upsert_category
+from src.services.report_service import invalidate_report_cache
+from src.utils.dates import day_end, day_start
+from src.utils.ids import generate_id
 from src.utils.logging import get_logger
 
 logger = get_logger(__name__)
 
+# Filas a partir de las cuales una carga masiva actualiza las estadísticas del planificador
+_ANALYZE_THRESHOLD = 1000
+
 
 class TransactionService:
     """Servicio para gestión de transacciones."""
@@ -24,6 +32,10 @@ class TransactionService:
     def __init__(self, db_session: Optional[Session] = None):
         """Inicializar servicio de transacciones."""
         self._db_session = db_session
+        # Categorías y cuentas resueltas por nombre (p. ej. en importaciones masivas)
+        self._category_cache: Dict[str, Category] = {}
+        self._account_cache: Dict[str, Account] = {}
+
     @property
     def db_session(self) -> Session:
         """Obtener sesión de base de datos."""
@@ -50,9 +62,10 @@ class TransactionService:
 
             # Obtener o crear cuenta
             account = self._get_or_create_account(account_name)
-              # Crear transacción
+
+            # Crear transacción
             transaction = Transaction(
-                id=str(uuid4()),
+                id=generate_id(),
                 amount=amount,
                 description=description,
                 transaction_type=transaction_type,
@@ -60,23 +73,84 @@ class TransactionService:
                 account_id=account.id,
                 payment_method=payment_method,
                 notes=notes,
-                transaction_date=transaction_date or datetime.now(),
-                created_at=datetime.now()
+                transaction_date=transaction_date or datetime.now()
             )
 
             # Establecer tags usando JSON
             if tags:
-                transaction.tags = json.dumps(tags)
+                self._set_tags(transaction, tags)
 
             self.db_session.add(transaction)
             self.db_session.commit()
+            invalidate_report_cache()
 
-            logger.info(f"Transacción creada: {transaction.id} - {amount} - {description}")
+            logger.info("Transacción creada: %s - %s - %s", transaction.id, amount, description)
             return transaction
 
         except Exception as e:
             self.db_session.rollback()
-            logger.error(f"Error al crear transacción: {e}")
+            self._clear_lookup_caches()
+            logger.error("Error al crear transacción: %s", e)
+            raise
+
+    def create_transactions_bulk(self, items: List[Dict[str, Any]]) -> int:
+        """
+        Crear varias transacciones con un único INSERT multi-fila y un commit.
+
+        Args:
+            items: Diccionarios con los mismos argumentos que `create_transaction`
+
+        Returns:
+            Número de transacciones creadas
+        """
+        try:
+            now = datetime.now()
+            rows = []
+            tag_rows = []
+            for item in items:
+                category = self._get_or_create_category(item.get('category_name', "general"))
+                account = self._get_or_create_account(item.get('account_name', "default"))
+                tags = item.get('tags')
+                transaction_id = generate_id()
+
+                rows.append({
+                    'id': transaction_id,
+                    'amount': item['amount'],
+                    'description': item['description'],
+                    'transaction_type': item['transaction_type'],
+                    'category_id': category.id,
+                    'account_id': account.id,
+                    'payment_method': item.get('payment_method', "cash"),
+                    'tags': json.dumps(tags) if tags else None,
+                    'notes': item.get('notes'),
+                    'transaction_date': item.get('transaction_date') or now
+                })
+                if tags:
+                    tag_rows.extend(
+                        {'transaction_id': transaction_id, 'tag': tag}
+                        for tag in dict.fromkeys(tags)
+                    )
+
+            if not rows:
+                return 0
+
+            # Core insert con lista de parámetros: executemany sin construir objetos ORM
+            self.db_session.execute(insert(Transaction), rows)
+            if tag_rows:
+                self.db_session.execute(insert(TransactionTag), tag_rows)
+            self.db_session.commit()
+            invalidate_report_cache()
+
+            if len(rows) >= _ANALYZE_THRESHOLD:
+                analyze_database()
+
+            logger.info("Transacciones creadas en lote: %s", len(rows))
+            return len(rows)
+
+        except Exception as e:
+            self.db_session.rollback()
+            self._clear_lookup_caches()
+            logger.error("Error al crear transacciones en lote: %s", e)
             raise
 
     def get_transactions(
@@ -92,74 +166,222 @@ class TransactionService:
         max_amount: Optional[Decimal] = None,
         tags: Optional[List[str]] = None,
         search_text: Optional[str] = None,
-        order_by: str = "date_desc"
+        order_by: str = "date_desc",
+        after_date: Optional[datetime] = None,
+        after_id: Optional[str] = None
     ) -> List[Transaction]:
-        """Obtener transacciones con filtros."""
-        try:
-            query = self.db_session.query(Transaction)
+        """
+        Obtener transacciones con filtros.
 
-            # Aplicar filtros
-            if transaction_type:
-                query = query.filter(Transaction.transaction_type == transaction_type)
+        Para recorrer páginas sin OFFSET se pasa como cursor la fecha y el ID
+        de la última transacción recibida (`after_date`, `after_id`); solo es
+        válido con el orden por defecto `date_desc`.
+        """
+        try:
+            # Sentencia lambda: SQLAlchemy cachea la construcción de cada combinación
+            # de filtros y en llamadas siguientes solo extrae los nuevos parámetros.
+            # La categoría se carga en el mismo SELECT: los listados muestran su nombre
+            statement = lambda_stmt(
+                lambda: select(Transaction).options(joinedload(Transaction.category))
+            )
+            statement = self._apply_filters(
+                statement, limit, offset, transaction_type, category_name, account_name,
+                start_date, end_date, min_amount, max_amount, tags, search_text, order_by,
+                after_date, after_id
+            )
 
-            if category_name:
-                query = query.join(Category).filter(Category.name == category_name)
+            return self.db_session.execute(statement).scalars().all()
 
-            if account_name:
-                query = query.join(Account).filter(Account.name == account_name)
+        except Exception as e:
+            logger.error("Error al obtener transacciones: %s", e)
+            raise
 
-            if start_date:
-                query = query.filter(Transaction.transaction_date >= start_date)
+    def get_transactions_summary_rows(
+        self,
+        limit: int = 50,
+        offset: int = 0,
+        transaction_type: Optional[TransactionType] = None,
+        category_name: Optional[str] = None,
+        account_name: Optional[str] = None,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        min_amount: Optional[Decimal] = None,
+        max_amount: Optional[Decimal] = None,
+        tags: Optional[List[str]] = None,
+        search_text: Optional[str] = None,
+        order_by: str = "date_desc",
+        after_date: Optional[datetime] = None,
+        after_id: Optional[str] = None
+    ) -> List[Row]:
+        """
+        Obtener filas livianas de transacciones para listados.
+
+        Acepta los mismos filtros que `get_transactions`, pero devuelve solo las
+        columnas que se muestran (id, transaction_date, amount, description,
+        transaction_type, category_name) sin construir objetos ORM. Para editar
+        una transacción se debe usar `get_transactions` o `get_transaction_by_id`.
+        """
+        try:
+            statement = self._apply_filters(
+                self._summary_rows_statement(), limit, offset, transaction_type,
+                category_name, account_name, start_date, end_date, min_amount,
+                max_amount, tags, search_text, order_by, after_date, after_id
+            )
 
-            if end_date:
-                query = query.filter(Transaction.transaction_date <= end_date)
+            return self.db_session.execute(statement).all()
 
-            if min_amount is not None:
-                query = query.filter(Transaction.amount >= min_amount)
+        except Exception as e:
+            logger.error("Error al obtener filas de transacciones: %s", e)
+            raise
 
-            if max_amount is not None:
-                query = query.filter(Transaction.amount <= max_amount)
+    def iter_transactions_summary_rows(self, batch: int = 1000, **filters: Any) -> Iterator[Row]:
+        """
+        Recorrer filas livianas de transacciones en lotes sin materializar la lista.
 
-            if tags:
-                for tag in tags:
-                    query = query.filter(Transaction.tags.contains([tag]))
-
-            if search_text:
-                search_pattern = f"%{search_text}%"
-                query = query.filter(
-                    or_(
-                        Transaction.description.ilike(search_pattern),
-                        Transaction.notes.ilike(search_pattern)
-                    )
-                )
+        Pensado para consumidores que recorren todas las transacciones que
+        cumplen los filtros una sola vez (por ejemplo exportaciones).
 
-            # Aplicar ordenamiento
-            if order_by == "date_desc":
-                query = query.order_by(desc(Transaction.transaction_date))
-            elif order_by == "date_asc":
-                query = query.order_by(asc(Transaction.transaction_date))
-            elif order_by == "amount_desc":
-                query = query.order_by(desc(Transaction.amount))
-            elif order_by == "amount_asc":
-                query = query.order_by(asc(Transaction.amount))
+        Args:
+            batch: Cantidad de filas por lote
+            **filters: Filtros y orden de `get_transactions_summary_rows`
+                (sin `limit` ni `offset`)
 
-            # Aplicar paginación
-            query = query.offset(offset).limit(limit)
+        Yields:
+            Filas con las mismas columnas que `get_transactions_summary_rows`
+        """
+        try:
+            statement = self._apply_filters(
+                self._summary_rows_statement(), limit=None, offset=0, **filters
+            )
 
-            return query.all()
+            # yield_per implica stream_results: cursor del servidor donde el driver lo soporta
+            yield from self.db_session.execute(
+                statement, execution_options={'yield_per': batch}
+            )
 
         except Exception as e:
-            logger.error(f"Error al obtener transacciones: {e}")
+            logger.error("Error al recorrer filas de transacciones: %s", e)
             raise
 
+    @staticmethod
+    def _summary_rows_statement() -> StatementLambdaElement:
+        """Sentencia base del listado liviano: solo las columnas que se muestran."""
+        return lambda_stmt(
+            lambda: select(
+                Transaction.id,
+                Transaction.transaction_date,
+                Transaction.amount,
+                Transaction.description,
+                Transaction.transaction_type,
+                Category.name.label('category_name')
+            ).outerjoin_from(Transaction, Category)
+        )
+
+    def _apply_filters(
+        self,
+        statement: StatementLambdaElement,
+        limit: Optional[int],
+        offset: int,
+        transaction_type: Optional[TransactionType] = None,
+        category_name: Optional[str] = None,
+        account_name: Optional[str] = None,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        min_amount: Optional[Decimal] = None,
+        max_amount: Optional[Decimal] = None,
+        tags: Optional[List[str]] = None,
+        search_text: Optional[str] = None,
+        order_by: str = "date_desc",
+        after_date: Optional[datetime] = None,
+        after_id: Optional[str] = None
+    ) -> StatementLambdaElement:
+        """Aplicar filtros, ordenamiento y paginación a una sentencia lambda de listado."""
+        # Aplicar filtros
+        if transaction_type:
+            statement += lambda s: s.where(Transaction.transaction_type == transaction_type)
+
+        # Categoría y cuenta por subconsulta: válido con o sin la categoría ya unida
+        if category_name:
+            statement += lambda s: s.where(Transaction.category_id.in_(
+                select(Category.id).where(Category.name == category_name)
+            ))
+
+        if account_name:
+            statement += lambda s: s.where(Transaction.account_id.in_(
+                select(Account.id).where(Account.name == account_name)
+            ))
+
+        # Límites como datetime: el día final se incluye completo
+        if start_date:
+            start_dt = day_start(start_date)
+            statement += lambda s: s.where(Transaction.transaction_date >= start_dt)
+
+        if end_date:
+            end_dt = day_end(end_date)
+            statement += lambda s: s.where(Transaction.transaction_date <= end_dt)
+
+        if min_amount is not None:
+            statement += lambda s: s.where(Transaction.amount >= min_amount)
+
+        if max_amount is not None:
+            statement += lambda s: s.where(Transaction.amount <= max_amount)
+
+        if tags:
+            # Transacciones con todos los tags, buscadas por el índice de transaction_tags
+            tag_list = list(dict.fromkeys(tags))
+            tag_count = len(tag_list)
+            statement += lambda s: s.where(Transaction.id.in_(
+                select(TransactionTag.transaction_id)
+                .where(TransactionTag.tag.in_(tag_list))
+                .group_by(TransactionTag.transaction_id)
+                .having(func.count() == tag_count)
+            ))
+
+        if search_text:
+            # Índice de texto completo (FTS5 / GIN) según el dialecto
+            condition = search_condition(self.db_session.get_bind().dialect.name, search_text)
+            if condition is not None:
+                statement += lambda s: s.where(condition)
+
+        # Paginación por cursor (keyset): sigue después de la última fila vista
+        # sin leer y descartar las anteriores como hace OFFSET
+        if after_date is not None:
+            if order_by != "date_desc":
+                raise ValueError("La paginación por cursor requiere order_by='date_desc'")
+
+            if after_id is not None:
+                statement += lambda s: s.where(
+                    tuple_(Transaction.transaction_date, Transaction.id)
+                    < tuple_(after_date, after_id)
+                )
+            else:
+                statement += lambda s: s.where(Transaction.transaction_date < after_date)
+
+        # Aplicar ordenamiento (el ID desempata transacciones con la misma fecha)
+        if order_by == "date_desc":
+            statement += lambda s: s.order_by(
+                desc(Transaction.transaction_date), desc(Transaction.id)
+            )
+        elif order_by == "date_asc":
+            statement += lambda s: s.order_by(asc(Transaction.transaction_date))
+        elif order_by == "amount_desc":
+            statement += lambda s: s.order_by(desc(Transaction.amount))
+        elif order_by == "amount_asc":
+            statement += lambda s: s.order_by(asc(Transaction.amount))
+
+        # Aplicar paginación (sin límite al recorrer todas las filas)
+        if limit is None:
+            statement += lambda s: s.offset(offset)
+        else:
+            statement += lambda s: s.offset(offset).limit(limit)
+        return statement
+
     def get_transaction_by_id(self, transaction_id: str) -> Optional[Transaction]:
         """Obtener transacción por ID."""
         try:
-            return self.db_session.query(Transaction).filter(
-                Transaction.id == transaction_id
-            ).first()
+            return self.db_session.get(Transaction, transaction_id)
         except Exception as e:
-            logger.error(f"Error al obtener transacción {transaction_id}: {e}")
+            logger.error("Error al obtener transacción %s: %s", transaction_id, e)
             raise
 
     def update_transaction(
@@ -176,13 +398,17 @@ class TransactionService:
             # Actualizar campos permitidos
             allowed_fields = [
                 'amount', 'description', 'transaction_type', 'payment_method',
-                'tags', 'notes', 'transaction_date'
+                'notes', 'transaction_date'
             ]
 
             for field, value in kwargs.items():
                 if field in allowed_fields and value is not None:
                     setattr(transaction, field, value)
 
+            # Reemplazar tags (lista vacía para quitarlos)
+            if kwargs.get('tags') is not None:
+                self._set_tags(transaction, kwargs['tags'])
+
             # Actualizar categoría si se proporciona
             if 'category_name' in kwargs:
                 category = self._get_or_create_category(kwargs['category_name'])
@@ -193,15 +419,16 @@ class TransactionService:
                 account = self._get_or_create_account(kwargs['account_name'])
                 transaction.account_id = account.id
 
-            transaction.updated_at = datetime.now()
             self.db_session.commit()
+            invalidate_report_cache()
 
-            logger.info(f"Transacción actualizada: {transaction_id}")
+            logger.info("Transacción actualizada: %s", transaction_id)
             return transaction
 
         except Exception as e:
             self.db_session.rollback()
-            logger.error(f"Error al actualizar transacción {transaction_id}: {e}")
+            self._clear_lookup_caches()
+            logger.error("Error al actualizar transacción %s: %s", transaction_id, e)
             raise
 
     def delete_transaction(self, transaction_id: str) -> bool:
@@ -213,13 +440,14 @@ class TransactionService:
 
             self.db_session.delete(transaction)
             self.db_session.commit()
+            invalidate_report_cache()
 
-            logger.info(f"Transacción eliminada: {transaction_id}")
+            logger.info("Transacción eliminada: %s", transaction_id)
             return True
 
         except Exception as e:
             self.db_session.rollback()
-            logger.error(f"Error al eliminar transacción {transaction_id}: {e}")
+            logger.error("Error al eliminar transacción %s: %s", transaction_id, e)
             raise
 
     def get_summary(
@@ -230,43 +458,47 @@ class TransactionService:
     ) -> Dict[str, Any]:
         """Obtener resumen de transacciones."""
         try:
-            query = self.db_session.query(Transaction)
+            # Consultas Core: devuelven filas/escalares sin pasar por el identity map
+            filters = []
 
-            # Aplicar filtros de fecha
+            # Aplicar filtros de fecha (el día final se incluye completo)
             if start_date:
-                query = query.filter(Transaction.transaction_date >= start_date)
+                filters.append(Transaction.transaction_date >= day_start(start_date))
             if end_date:
-                query = query.filter(Transaction.transaction_date <= end_date)
+                filters.append(Transaction.transaction_date <= day_end(end_date))
 
             # Filtrar por cuenta si se especifica
             if account_name:
-                query = query.join(Account).filter(Account.name == account_name)
-
-            # Calcular totales por tipo
-            income_total = query.filter(
-                Transaction.transaction_type == TransactionType.INCOME
-            ).with_entities(func.sum(Transaction.amount)).scalar() or Decimal('0')
-
-            expense_total = query.filter(
-                Transaction.transaction_type == TransactionType.EXPENSE
-            ).with_entities(func.sum(Transaction.amount)).scalar() or Decimal('0')
-
-            # Obtener top categorías de gastos
-            top_categories = (
-                query.filter(Transaction.transaction_type == TransactionType.EXPENSE)
-                .join(Category)
-                .with_entities(
-                    Category.name,
-                    func.sum(Transaction.amount).label('total')
-                )
+                filters.append(Transaction.account_id.in_(
+                    select(Account.id).where(Account.name == account_name)
+                ))
+
+            # Totales por tipo y cantidad de transacciones en una sola consulta
+            income_total, expense_total, total_transactions = self.db_session.execute(
+                select(
+                    func.sum(case(
+                        (Transaction.transaction_type == TransactionType.INCOME, Transaction.amount),
+                        else_=0
+                    )),
+                    func.sum(case(
+                        (Transaction.transaction_type == TransactionType.EXPENSE, Transaction.amount),
+                        else_=0
+                    )),
+                    func.count(Transaction.id)
+                ).where(*filters)
+            ).one()
+            income_total = income_total or Decimal('0')
+            expense_total = expense_total or Decimal('0')
+
+            # Obtener top categorías de gastos (solo si hubo gastos)
+            top_categories = self.db_session.execute(
+                select(Category.name, func.sum(Transaction.amount).label('total'))
+                .join_from(Transaction, Category)
+                .where(*filters, Transaction.transaction_type == TransactionType.EXPENSE)
                 .group_by(Category.name)
                 .order_by(desc('total'))
                 .limit(5)
-                .all()
-            )
-
-            # Contar transacciones
-            total_transactions = query.count()
+            ).all() if expense_total else []
 
             return {
                 'income_total': income_total,
@@ -284,46 +516,69 @@ class TransactionService:
             }
 
         except Exception as e:
-            logger.error(f"Error al obtener resumen: {e}")
+            logger.error("Error al obtener resumen: %s", e)
             raise
 
+    @staticmethod
+    def _set_tags(transaction: Transaction, tags: List[str]) -> None:
+        """Guardar los tags como JSON (para mostrar) y como filas de transaction_tags."""
+        unique_tags = list(dict.fromkeys(tags))
+        transaction.tags = json.dumps(unique_tags) if unique_tags else None
+        transaction.tag_links = [TransactionTag(tag=tag) for tag in unique_tags]
+
     def _get_or_create_category(self, name: str) -> Category:
-        """Obtener o crear categoría."""
-        category = self.db_session.query(Category).filter(
-            Category.name == name
-        ).first()
+        """Obtener o crear categoría (cacheada por nombre durante la sesión)."""
+        category = self._category_cache.get(name)
+        if category is not None:
+            return category
+
+        category = upsert_category(self.db_session, name)
+        if category is None:
+            category = self.db_session.query(Category).filter(
+                Category.name == name
+            ).first()
 
         if not category:
             category = Category(
-                id=str(uuid4()),
+                id=generate_id(),
                 name=name,
-                description=f"Categoría {name}",
-                created_at=datetime.now()
+                description=f"Categoría {name}"
             )
             self.db_session.add(category)
             self.db_session.flush()
 
+        self._category_cache[name] = category
         return category
 
     def _get_or_create_account(self, name: str) -> Account:
-        """Obtener o crear cuenta."""
+        """Obtener o crear cuenta (cacheada por nombre durante la sesión)."""
+        # El nombre de cuenta no es único: no hay conflicto sobre el que hacer upsert
+        account = self._account_cache.get(name)
+        if account is not None:
+            return account
+
         account = self.db_session.query(Account).filter(
             Account.name == name
         ).first()
 
         if not account:
             account = Account(
-                id=str(uuid4()),
+                id=generate_id(),
                 name=name,
                 account_type="general",
-                balance=Decimal('0'),
-                created_at=datetime.now()
+                balance=Decimal('0')
             )
             self.db_session.add(account)
             self.db_session.flush()
 
+        self._account_cache[name] = account
         return account
 
+    def _clear_lookup_caches(self) -> None:
+        """Descartar categorías y cuentas cacheadas (pueden no persistir tras un rollback)."""
+        self._category_cache.clear()
+        self._account_cache.clear()
+
     def close(self):
         """Cerrar sesión de base de datos."""
         if self._db_session:
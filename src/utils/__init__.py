@@ -1,5 +1,6 @@
 """Módulo de utilidades de Sales Command."""
 
+from src.utils.ids import generate_id, uuid7
 from src.utils.logging import get_logger, setup_logging, LoggerMixin
 
-__all__ = ["get_logger", "setup_logging", "LoggerMixin"]
+__all__ = ["generate_id", "uuid7", "get_logger", "setup_logging", "LoggerMixin"]
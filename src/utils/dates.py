@@ -0,0 +1,29 @@
+"""Utilidades de fechas para filtros sobre columnas DateTime."""
+
+from __future__ import annotations
+
+from datetime import date, datetime, time
+
+
+def day_start(value: date) -> datetime:
+    """
+    Obtener el primer instante del día como límite inferior de un filtro.
+
+    Un `datetime` se devuelve sin cambios: ya es un instante concreto.
+    """
+    if isinstance(value, datetime):
+        return value
+    return datetime.combine(value, time.min)
+
+
+def day_end(value: date) -> datetime:
+    """
+    Obtener el último instante del día como límite superior inclusivo.
+
+    Comparar `transaction_date <= fecha` con una fecha sin hora excluiría las
+    transacciones de ese día posteriores a la medianoche. Un `datetime` se
+    devuelve sin cambios.
+    """
+    if isinstance(value, datetime):
+        return value
+    return datetime.combine(value, time.max)
@@ -0,0 +1,35 @@
+"""Generación de identificadores para Sales Command."""
+
+from __future__ import annotations
+
+import os
+import time
+from uuid import UUID
+
+_VERSION_7 = 0x7 << 76
+_VARIANT_RFC4122 = 0b10 << 62
+_VERSION_MASK = ~(0xF << 76)
+_VARIANT_MASK = ~(0b11 << 62)
+
+
+def uuid7() -> UUID:
+    """
+    Generar un UUID versión 7 (RFC 9562) ordenado por tiempo.
+
+    Los primeros 48 bits son el timestamp Unix en milisegundos, por lo que
+    los IDs nuevos se insertan al final del índice de la clave primaria en
+    lugar de en posiciones aleatorias como con `uuid4`.
+
+    Returns:
+        UUID versión 7
+    """
+    timestamp_ms = time.time_ns() // 1_000_000
+    value = (timestamp_ms & 0xFFFF_FFFF_FFFF) << 80
+    value |= int.from_bytes(os.urandom(10), "big")
+    value = (value & _VERSION_MASK & _VARIANT_MASK) | _VERSION_7 | _VARIANT_RFC4122
+    return UUID(int=value)
+
+
+def generate_id() -> str:
+    """Generar ID de clave primaria como string (UUID v7)."""
+    return str(uuid7())
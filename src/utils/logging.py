@@ -2,14 +2,55 @@
 
 from __future__ import annotations
 
+import atexit
+import copy
+import importlib.util
 import logging
+import queue
 import sys
+import threading
+import time
+from functools import cached_property, lru_cache
+from logging.handlers import MemoryHandler, QueueHandler, QueueListener
 from pathlib import Path
 from typing import Optional
 
 from rich.console import Console
+from rich.highlighter import NullHighlighter
 from rich.logging import RichHandler
 
+# Frames mostrados en los tracebacks enriquecidos de Rich (modo DEBUG)
+_TRACEBACK_MAX_FRAMES = 5
+
+# Paquetes cuyos frames se ocultan en los tracebacks enriquecidos
+_TRACEBACK_SUPPRESS_PACKAGES = ("sqlalchemy",)
+
+# Consola de logs compartida: llamadas repetidas a setup_logging la reutilizan
+_CONSOLE = Console(stderr=True)
+
+# Registros acumulados en memoria antes de escribirlos al archivo de log
+_FILE_BUFFER_CAPACITY = 1024
+# Segundos máximos que un registro puede quedar en el buffer sin escribirse
+_FILE_FLUSH_INTERVAL = 30.0
+
+_buffered_handler: Optional[MemoryHandler] = None
+_flush_thread: Optional[threading.Thread] = None
+_queue_listener: Optional[QueueListener] = None
+
+
+def _traceback_suppress_paths() -> list[str]:
+    """Directorios de los paquetes a ocultar, localizados sin importarlos.
+
+    Rich interpreta las cadenas de `tracebacks_suppress` como rutas, no
+    como nombres de módulo.
+    """
+    paths: list[str] = []
+    for name in _TRACEBACK_SUPPRESS_PACKAGES:
+        spec = importlib.util.find_spec(name)
+        if spec is not None and spec.submodule_search_locations:
+            paths.extend(spec.submodule_search_locations)
+    return paths
+
 
 def setup_logging(
     level: str = "INFO",
@@ -24,22 +65,34 @@ def setup_logging(
         log_file: Archivo donde guardar logs (opcional)
         console_output: Si mostrar logs en consola
     """
-    # Configurar formato de logs
+    # Configurar formato de logs (un único Formatter compartido por los handlers)
     log_format = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+    formatter = logging.Formatter(log_format)
 
-    # Configurar handlers
-    handlers: list[logging.Handler] = []
+    # Handlers reales: escriben desde el hilo del QueueListener
+    real_handlers: list[logging.Handler] = []
 
-    # Handler para consola con Rich
+    # Handler para consola con Rich. La ruta de origen y los tracebacks
+    # enriquecidos solo en DEBUG: ambos inspeccionan frames en cada registro
+    debug = level.upper() == "DEBUG"
     if console_output:
         console_handler = RichHandler(
-            console=Console(stderr=True),
+            console=_CONSOLE,
             show_time=True,
-            show_path=True,
-            rich_tracebacks=True,
+            show_path=debug,
+            # Mensajes como texto plano: sin parser de markup, sin regex de
+            # resaltado ni búsqueda de palabras clave HTTP por registro
+            markup=False,
+            highlighter=NullHighlighter(),
+            keywords=[],
+            rich_tracebacks=debug,
+            # Acotar el render: cada frame lee y resalta el código fuente
+            tracebacks_show_locals=False,
+            tracebacks_max_frames=_TRACEBACK_MAX_FRAMES,
+            tracebacks_suppress=_traceback_suppress_paths() if debug else [],
         )
-        console_handler.setFormatter(logging.Formatter(log_format))
-        handlers.append(console_handler)
+        console_handler.setFormatter(formatter)
+        real_handlers.append(console_handler)
 
     # Handler para archivo
     if log_file:
@@ -49,15 +102,33 @@ def setup_logging(
             mode="a",
             encoding="utf-8"
         )
-        file_handler.setFormatter(logging.Formatter(log_format))
-        handlers.append(file_handler)
+        file_handler.setFormatter(formatter)
+
+        # Escrituras al archivo en bloque: un write por lote en lugar de uno
+        # por registro; ERROR o superior se escribe de inmediato. Al salir,
+        # logging.shutdown() cierra el buffer y vuelca lo pendiente.
+        buffered_handler = MemoryHandler(
+            capacity=_FILE_BUFFER_CAPACITY,
+            flushLevel=logging.ERROR,
+            target=file_handler,
+            flushOnClose=True,
+        )
+        _start_periodic_flush(buffered_handler)
+        real_handlers.append(buffered_handler)
 
-    # Configurar logging básico
-    logging.basicConfig(
-        level=getattr(logging, level.upper()),
-        handlers=handlers,
-        format=log_format,
-    )
+    # El hilo que registra solo encola: el render de Rich y la escritura al
+    # archivo ocurren en segundo plano
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    _start_queue_listener(log_queue, real_handlers)
+
+    # Configurar el logger raíz directamente: a diferencia de basicConfig,
+    # una segunda llamada reemplaza los handlers en lugar de ignorarse
+    root_logger = logging.getLogger()
+    root_logger.handlers[:] = [_RecordQueueHandler(log_queue)]
+    root_logger.setLevel(getattr(logging, level.upper()))
+
+    # Los avisos de `warnings` pasan por los mismos handlers
+    logging.captureWarnings(True)
 
     # Configurar loggers específicos
     logging.getLogger("sqlalchemy.engine").setLevel(logging.WARNING)
@@ -65,12 +136,66 @@ def setup_logging(
 
     # Logger principal de la aplicación
     logger = logging.getLogger("sales_command")
-    logger.info(f"Sistema de logging configurado - Nivel: {level}")
+    logger.info("Sistema de logging configurado - Nivel: %s", level)
+
+
+class _RecordQueueHandler(QueueHandler):
+    """QueueHandler que encola el registro sin formatearlo."""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Resolver el mensaje ya (los args podrían mutar antes de procesarse)
+        # pero conservar exc_info para que cada handler muestre el traceback;
+        # el formato lo aplica cada handler real
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+def _start_queue_listener(log_queue: queue.SimpleQueue, handlers: list[logging.Handler]) -> None:
+    """Iniciar el QueueListener que entrega los registros a los handlers reales."""
+    global _queue_listener
+    _stop_queue_listener()
+    _queue_listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _queue_listener.start()
+
+
+def _stop_queue_listener() -> None:
+    """Detener el QueueListener activo procesando los registros pendientes."""
+    global _queue_listener
+    if _queue_listener is not None:
+        _queue_listener.stop()
+        for handler in _queue_listener.handlers:
+            handler.close()
+        _queue_listener = None
+
+
+# Registrado después del `logging.shutdown` del módulo logging, por lo que se
+# ejecuta antes: la cola se vacía en los handlers antes de cerrarlos
+atexit.register(_stop_queue_listener)
+
+
+def _start_periodic_flush(handler: MemoryHandler) -> None:
+    """Volcar periódicamente el buffer de logs desde un hilo en segundo plano."""
+    global _buffered_handler, _flush_thread
+    _buffered_handler = handler
+    if _flush_thread is None:
+        _flush_thread = threading.Thread(target=_flush_loop, name="log-flush", daemon=True)
+        _flush_thread.start()
+
+
+def _flush_loop() -> None:
+    """Volcar el buffer activo cada `_FILE_FLUSH_INTERVAL` segundos."""
+    while True:
+        time.sleep(_FILE_FLUSH_INTERVAL)
+        if _buffered_handler is not None:
+            _buffered_handler.flush()
 
 
+@lru_cache(maxsize=None)
 def get_logger(name: str) -> logging.Logger:
     """
-    Obtener logger configurado para un módulo específico.
+    Obtener logger configurado para un módulo específico (cacheado por nombre).
 
     Args:
         name: Nombre del logger (normalmente __name__)
@@ -78,13 +203,14 @@ def get_logger(name: str) -> logging.Logger:
     Returns:
         Logger configurado
     """
-    return logging.getLogger(f"sales_command.{name}")
+    # Nombre internado: las búsquedas en el registro de loggers comparan por identidad
+    return logging.getLogger(sys.intern(f"sales_command.{name}"))
 
 
 class LoggerMixin:
     """Mixin para agregar capacidades de logging a cualquier clase."""
 
-    @property
+    @cached_property
     def logger(self) -> logging.Logger:
-        """Logger específico para la clase."""
-        return get_logger(self.__class__.__name__)
+        """Logger específico para la clase (se resuelve una vez por instancia)."""
+        return get_logger(type(self).__name__)
@@ -1,45 +1,108 @@
 """Configuración común para tests de Sales Command."""
 
 import pytest
-from pathlib import Path
-import tempfile
-import shutil
-from unittest.mock import patch
+from unittest.mock import Mock
 
-from src.config.settings import get_settings, reload_settings
-from src.database.connection import init_database, reset_database, close_connections
+from sqlalchemy.orm import Session
+
+from src.config.settings import get_settings, override_settings
+from src.database.connection import close_connections, get_engine, init_database, reset_database
+from src.database.models import Base
+from src.services.report_service import invalidate_report_cache
+from src.services.transaction_service import TransactionService
 
 
 @pytest.fixture(scope="session")
-def test_data_dir():
-    """Crear directorio temporal para datos de test."""
-    temp_dir = Path(tempfile.mkdtemp())
-    yield temp_dir
-    shutil.rmtree(temp_dir)
+def session_settings():
+    """Configuración de test con base de datos SQLite en memoria (una por sesión).
 
+    El engine de SQLite usa StaticPool, así que todas las sesiones comparten
+    la misma conexión y por tanto la misma base en memoria. Con pytest-xdist
+    cada worker es un proceso con su propia base: no hay estado compartido.
+    """
+    previous = get_settings()
+    settings = override_settings(
+        database_url="sqlite+pysqlite:///:memory:",
+        debug=True,
+        log_level="DEBUG",
+    )
+    yield settings
+    close_connections()
+    override_settings(
+        database_url=previous.database_url,
+        debug=previous.debug,
+        log_level=previous.log_level,
+    )
 
-@pytest.fixture(scope="function")
-def test_settings(test_data_dir):
-    """Configuración de test con base de datos temporal."""
-    test_db_path = test_data_dir / "test_sales.db"
 
-    with patch.dict("os.environ", {
-        "DATABASE_URL": f"sqlite:///{test_db_path}",
-        "DEBUG": "True",
-        "LOG_LEVEL": "DEBUG",
-    }):
-        settings = reload_settings()
-        yield settings
-        close_connections()
+@pytest.fixture(scope="session")
+def test_schema(session_settings):
+    """Esquema de la base de datos de test, creado una sola vez por sesión."""
+    init_database()
+    yield
+    reset_database()
 
 
 @pytest.fixture(scope="function")
-def test_db(test_settings):
-    """Base de datos de test inicializada."""
-    init_database()
+def test_db(test_schema):
+    """Base de datos de test inicializada y vacía al terminar cada test."""
     yield
-    reset_database()
-    close_connections()
+    _truncate_tables()
+    invalidate_report_cache()
+
+
+def _truncate_tables() -> None:
+    """Vaciar todas las tablas (hijas antes que padres) conservando el esquema."""
+    with get_engine().begin() as connection:
+        for table in reversed(Base.metadata.sorted_tables):
+            connection.execute(table.delete())
+
+
+# Atributos de Session calculados una vez: los mocks solo aceptan estos nombres
+_SESSION_SPEC = dir(Session)
+
+
+@pytest.fixture(scope="session")
+def session_spec():
+    """Nombres de atributos de Session para construir mocks de sesión."""
+    return _SESSION_SPEC
+
+
+@pytest.fixture
+def mock_session():
+    """Mock de sesión de base de datos limitado a la interfaz de Session."""
+    return Mock(spec=_SESSION_SPEC)
+
+
+@pytest.fixture(scope="session")
+def service_factory():
+    """Constructor de TransactionService con sesión mock y búsquedas resueltas.
+
+    Cada llamada devuelve un servicio nuevo cuya categoría (cat-123) y cuenta
+    (acc-456) se resuelven sin consultar la sesión; `overrides` reemplaza
+    atributos del servicio.
+    """
+    def make(**overrides):
+        service = TransactionService(db_session=Mock(spec=_SESSION_SPEC))
+        service._get_or_create_category = Mock(return_value=Mock(id="cat-123"))
+        service._get_or_create_account = Mock(return_value=Mock(id="acc-456"))
+        for name, value in overrides.items():
+            setattr(service, name, value)
+        return service
+
+    return make
+
+
+@pytest.fixture
+def chained_query(mock_session):
+    """Query encadenable (`query().filter().order_by()`) devuelta por `mock_session.query`."""
+    query = Mock()
+    query.filter.return_value = query
+    query.order_by.return_value = query
+    query.first.return_value = None
+    query.all.return_value = []
+    mock_session.query.return_value = query
+    return query
 
 
 @pytest.fixture
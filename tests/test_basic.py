@@ -1,5 +1,6 @@
 """Test básico para validar configuración del proyecto."""
 
+import os
 import pytest
 from pathlib import Path
 
@@ -7,15 +8,13 @@ def test_project_structure():
     """Verificar que la estructura del proyecto existe."""
     base_path = Path(__file__).parent.parent
 
-    # Verificar directorios principales
-    assert (base_path / "src").exists()
-    assert (base_path / "tests").exists()
-    assert (base_path / ".vscode").exists()
+    # Un único listado del directorio en lugar de un stat por entrada
+    with os.scandir(base_path) as entries:
+        names = {entry.name for entry in entries}
 
-    # Verificar archivos de configuración
-    assert (base_path / "pyproject.toml").exists()
-    assert (base_path / "README.md").exists()
-    assert (base_path / ".gitignore").exists()
+    # Directorios principales y archivos de configuración
+    assert {"src", "tests", ".vscode"} <= names
+    assert {"pyproject.toml", "README.md", ".gitignore"} <= names
 
 
 def test_import_main_modules():
@@ -32,6 +31,50 @@ def test_import_main_modules():
     assert logger is not None
 
 
+def test_override_settings_updates_only_given_fields():
+    """Verificar que override_settings copia la configuración con los campos indicados."""
+    from src.config.settings import get_settings, override_settings
+
+    previous = get_settings()
+    try:
+        settings = override_settings(max_export_records=5)
+
+        assert get_settings() is settings
+        assert settings.max_export_records == 5
+        assert settings.database_url == previous.database_url
+        assert previous is not settings
+    finally:
+        override_settings(max_export_records=previous.max_export_records)
+
+
+def test_setup_logging_reconfigures_root(tmp_path):
+    """Verificar que una segunda llamada a setup_logging reemplaza la configuración."""
+    import logging
+    from logging.handlers import QueueHandler
+
+    from src.utils.logging import _stop_queue_listener, get_logger, setup_logging
+
+    root = logging.getLogger()
+    saved_handlers, saved_level = root.handlers[:], root.level
+    try:
+        setup_logging("INFO", tmp_path / "first.log", console_output=False)
+        setup_logging("WARNING", tmp_path / "second.log", console_output=False)
+
+        assert len(root.handlers) == 1
+        assert isinstance(root.handlers[0], QueueHandler)
+        assert root.level == logging.WARNING
+
+        get_logger("test").error("registro de prueba")
+    finally:
+        _stop_queue_listener()
+        logging.captureWarnings(False)
+        root.handlers[:] = saved_handlers
+        root.setLevel(saved_level)
+
+    assert "registro de prueba" in (tmp_path / "second.log").read_text(encoding="utf-8")
+    assert "registro de prueba" not in (tmp_path / "first.log").read_text(encoding="utf-8")
+
+
 def test_database_models():
     """Verificar que los modelos de base de datos están bien definidos."""
     from src.database.models import Transaction, Category, Budget, Account
@@ -63,5 +106,134 @@ def test_settings_configuration():
     assert isinstance(settings.decimal_places, int)
 
 
+
+def test_transaction_filter_indexes(test_db):
+    """Verificar los índices compuestos de transacciones y el ANALYZE del planificador."""
+    from sqlalchemy import inspect, text
+
+    from src.database.connection import analyze_database, get_engine
+
+    engine = get_engine()
+    indexes = {
+        index['name']: index['column_names']
+        for index in inspect(engine).get_indexes("transactions")
+    }
+
+    assert indexes['ix_txn_cat_date'] == ['category_id', 'transaction_date']
+    assert indexes['ix_txn_acc_date'] == ['account_id', 'transaction_date']
+    assert indexes['ix_txn_date_type_cat_amount'][:2] == ['transaction_date', 'transaction_type']
+
+    analyze_database()
+    with engine.connect() as connection:
+        stats = connection.execute(
+            text("SELECT count(*) FROM sqlite_master WHERE name = 'sqlite_stat1'")
+        ).scalar()
+    assert stats == 1
+
+
+def test_upgrade_schema_adds_model_indexes(tmp_path):
+    """Verificar que una base con el esquema anterior recibe los índices nuevos una sola vez."""
+    from sqlalchemy import create_engine, inspect, select
+
+    from src.database.migrations import SCHEMA_VERSION, upgrade_schema
+    from src.database.models import Base, SchemaVersion
+
+    # Base con las tablas actuales pero los índices del esquema anterior
+    engine = create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+    Base.metadata.create_all(engine)
+    with engine.begin() as connection:
+        for table in Base.metadata.sorted_tables:
+            for index in table.indexes:
+                index.drop(connection)
+        connection.exec_driver_sql(
+            "CREATE INDEX ix_transactions_transaction_date ON transactions (transaction_date)"
+        )
+
+    upgrade_schema(engine, set(inspect(engine).get_table_names()))
+    upgrade_schema(engine, set(inspect(engine).get_table_names()))
+
+    inspector = inspect(engine)
+    transaction_indexes = {index['name'] for index in inspector.get_indexes("transactions")}
+    assert {'ix_txn_cat_type_date', 'ix_txn_cat_date', 'ix_txn_acc_date'} <= transaction_indexes
+    assert 'ix_transactions_transaction_date' not in transaction_indexes
+    assert 'ix_budget_active_year_month' in {i['name'] for i in inspector.get_indexes("budgets")}
+    with engine.connect() as connection:
+        assert connection.execute(select(SchemaVersion.version)).scalars().all() == [
+            SCHEMA_VERSION
+        ]
+    engine.dispose()
+
+
+def test_init_database_backfills_transaction_tags(test_db, caplog):
+    """Verificar que init_database copia los tags JSON una sola vez y omite los inválidos."""
+    from datetime import datetime
+    from decimal import Decimal
+
+    from sqlalchemy import delete, insert, select
+
+    from src.database.connection import get_engine, init_database
+    from src.database.migrations import SCHEMA_VERSION
+    from src.database.models import SchemaVersion, Transaction, TransactionTag
+
+    # Base en la versión previa a la copia, con tags solo en la columna JSON
+    engine = get_engine()
+    with engine.begin() as connection:
+        connection.execute(delete(SchemaVersion))
+        connection.execute(insert(SchemaVersion), {'version': SCHEMA_VERSION - 1})
+        connection.execute(insert(Transaction), [
+            {
+                'id': transaction_id, 'amount': Decimal("1.00"), 'description': "x",
+                'transaction_type': "expense", 'transaction_date': datetime(2025, 1, 1),
+                'tags': tags,
+            }
+            for transaction_id, tags in (
+                ("t-1", '["comida", "viaje", "comida"]'),
+                ("t-2", '["viaje"]'),
+                ("t-3", '["roto"'),
+                ("t-4", '"texto"'),
+            )
+        ])
+
+    init_database()
+
+    with engine.connect() as connection:
+        tag_rows = connection.execute(
+            select(TransactionTag.transaction_id, TransactionTag.tag)
+            .order_by(TransactionTag.transaction_id, TransactionTag.tag)
+        ).all()
+        version = connection.execute(select(SchemaVersion.version)).scalar()
+    assert [tuple(row) for row in tag_rows] == [
+        ("t-1", "comida"), ("t-1", "viaje"), ("t-2", "viaje")
+    ]
+    assert version == SCHEMA_VERSION
+    assert "Tags inválidos en la transacción t-3" in caplog.text
+    assert "Tags inválidos en la transacción t-4" in caplog.text
+
+    # La copia quedó registrada: los inicios siguientes no vuelven a recorrer las transacciones
+    with engine.begin() as connection:
+        connection.execute(delete(TransactionTag))
+    init_database()
+
+    with engine.connect() as connection:
+        assert connection.execute(select(TransactionTag.tag)).first() is None
+
+
+def test_generate_id_uuid7():
+    """Verificar que los IDs generados son UUID v7 ordenados por tiempo."""
+    import time
+    from uuid import RFC_4122, UUID
+
+    from src.utils.ids import generate_id
+
+    first = generate_id()
+    time.sleep(0.002)
+    second = generate_id()
+
+    assert UUID(first).version == 7
+    assert UUID(first).variant == RFC_4122
+    assert len(first) == 36
+    assert first < second
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
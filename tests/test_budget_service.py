@@ -4,21 +4,22 @@ from __future__ import annotations
 
 import pytest
 from decimal import Decimal
-from datetime import datetime
 from unittest.mock import Mock, patch
 
-from src.services.budget_service import BudgetService
+from src.services.budget_service import (
+    BudgetService,
+    CategoryAnalysis,
+    _ACTIVE_BUDGETS,
+    _ALL_BUDGETS,
+    _CURRENT_MONTHLY_BUDGET,
+    _CURRENT_YEARLY_BUDGET,
+)
 from src.database.models import Budget, BudgetCategory, Category
 
 
 class TestBudgetService:
     """Tests para BudgetService."""
 
-    @pytest.fixture
-    def mock_session(self):
-        """Mock de sesión de base de datos."""
-        return Mock()
-
     @pytest.fixture
     def service(self, mock_session):
         """Instancia del servicio con mock de sesión."""
@@ -81,40 +82,75 @@ class TestBudgetService:
         assert result.category_id == "cat-123"
         assert result.allocated_amount == Decimal("500.00")
         assert result.description == "Food expenses"
-          mock_session.add.assert_called_once()
+        mock_session.add.assert_called_once()
+        mock_session.commit.assert_called_once()
+
+    def test_add_budget_categories_single_commit(self, service, mock_session, chained_query):
+        """Test agregar varias categorías con un solo commit."""
+        # Arrange
+        existing = Category(id="cat-123", name="food")
+        chained_query.all.return_value = [existing]
+
+        # Act
+        result = service.add_budget_categories(
+            budget_id="budget-456",
+            items=[
+                ("food", Decimal("500.00"), "Food expenses"),
+                ("transport", Decimal("100.00"), None),
+            ]
+        )
+
+        # Assert
+        assert len(result) == 2
+        assert result[0].category_id == "cat-123"
+        assert result[1].category_id != "cat-123"
+        assert all(bc.budget_id == "budget-456" for bc in result)
+        mock_session.query.assert_called_once_with(Category)
         mock_session.commit.assert_called_once()
 
     def test_get_budgets_active_only(self, service, mock_session):
         """Test obtener solo presupuestos activos."""
         # Arrange
-        mock_query = Mock()
-        mock_session.query.return_value = mock_query
-        mock_query.filter.return_value = mock_query
-        mock_query.order_by.return_value = mock_query
-        mock_query.all.return_value = []
+        mock_session.execute.return_value.scalars.return_value.all.return_value = []
 
         # Act
         result = service.get_budgets(active_only=True)
 
         # Assert
         assert result == []
-        mock_session.query.assert_called_once_with(Budget)
-        mock_query.filter.assert_called_once()
+        mock_session.execute.assert_called_once_with(_ACTIVE_BUDGETS)
 
     def test_get_budgets_all(self, service, mock_session):
         """Test obtener todos los presupuestos."""
         # Arrange
-        mock_query = Mock()
-        mock_session.query.return_value = mock_query
-        mock_query.order_by.return_value = mock_query
-        mock_query.all.return_value = []
+        mock_session.execute.return_value.scalars.return_value.all.return_value = []
 
         # Act
         result = service.get_budgets(active_only=False)
 
         # Assert
         assert result == []
-        mock_session.query.assert_called_once_with(Budget)
+        mock_session.execute.assert_called_once_with(_ALL_BUDGETS)
+
+    def test_get_current_budget_reuses_statement(self, service, mock_session):
+        """Test presupuesto actual con la consulta precompilada y parámetros."""
+        # Arrange
+        budget = Mock(spec=Budget)
+        mock_session.execute.return_value.scalars.return_value.first.return_value = budget
+
+        # Act
+        monthly = service.get_current_budget(2025, 1)
+        yearly = service.get_current_budget(2025)
+
+        # Assert
+        assert monthly is budget
+        assert yearly is budget
+        assert mock_session.execute.call_args_list[0].args == (
+            _CURRENT_MONTHLY_BUDGET, {'year': 2025, 'month': 1}
+        )
+        assert mock_session.execute.call_args_list[1].args == (
+            _CURRENT_YEARLY_BUDGET, {'year': 2025}
+        )
 
     def test_create_budget_database_error(self, service, mock_session):
         """Test error en base de datos al crear presupuesto."""
@@ -147,13 +183,10 @@ class TestBudgetService:
 
         mock_session.rollback.assert_called_once()
 
-    def test_get_or_create_category_integration(self, service, mock_session):
+    def test_get_or_create_category_integration(self, service, mock_session, chained_query):
         """Test integración con _get_or_create_category."""
         # Arrange
-        mock_query = Mock()
-        mock_session.query.return_value = mock_query
-        mock_query.filter.return_value = mock_query
-        mock_query.first.return_value = None
+        chained_query.first.return_value = None
 
         # Act
         result = service._get_or_create_category("test_category")
@@ -163,3 +196,158 @@ class TestBudgetService:
         assert result.name == "test_category"
         mock_session.add.assert_called_once()
         mock_session.flush.assert_called_once()
+
+    def test_get_or_create_category_cached(self, service, mock_session, chained_query):
+        """Test la segunda búsqueda de una categoría usa la cache."""
+        # Arrange
+        chained_query.first.return_value = None
+
+        # Act
+        first = service._get_or_create_category("test_category")
+        second = service._get_or_create_category("test_category")
+
+        # Assert
+        assert second is first
+        mock_session.query.assert_called_once_with(Category)
+
+    def test_get_budget_analysis_category_results(self, service, mock_session):
+        """Test análisis por categoría devuelto como CategoryAnalysis."""
+        # Arrange
+        mock_session.get.return_value = Mock(
+            id="budget-123", period_type="monthly", year=2025, month=1
+        )
+        budget_category = Mock(category_id="cat-1", allocated_amount=Decimal("100.00"))
+        budget_category.category.name = "food"
+
+        categories_query = Mock()
+        categories_query.options.return_value = categories_query
+        categories_query.filter.return_value.all.return_value = [budget_category]
+        spent_query = Mock()
+        spent_query.filter.return_value.group_by.return_value.all.return_value = [
+            ("cat-1", Decimal("120.00"))
+        ]
+        mock_session.query.side_effect = [categories_query, spent_query]
+
+        # Act
+        result = service.get_budget_analysis("budget-123")
+
+        # Assert
+        assert result['categories'] == [
+            CategoryAnalysis(
+                category_name="food",
+                allocated_amount=Decimal("100.00"),
+                spent_amount=Decimal("120.00"),
+                remaining_amount=Decimal("-20.00"),
+                percentage_used=120.0,
+                is_over_budget=True
+            )
+        ]
+        assert result['categories'][0]._asdict()['category_name'] == "food"
+        assert result['is_over_budget'] is True
+        categories_query.options.assert_called_once()  # Categoría en el mismo SELECT
+
+    def test_get_or_create_category_upsert(self, service, mock_session):
+        """Test obtener o crear categoría con un único INSERT ... ON CONFLICT."""
+        # Arrange
+        category = Category(id="cat-1", name="food")
+        mock_session.get_bind.return_value.dialect.name = "sqlite"
+        mock_session.execute.return_value.scalar_one.return_value = category
+
+        # Act
+        result = service._get_or_create_category("food")
+
+        # Assert
+        assert result is category
+        mock_session.execute.assert_called_once()
+        mock_session.query.assert_not_called()
+        mock_session.flush.assert_not_called()
+
+    def test_get_current_budget_cached_until_change(self, service, mock_session):
+        """Test presupuesto actual cacheado hasta crear otro presupuesto."""
+        # Arrange
+        budget = Mock(spec=Budget)
+        mock_session.execute.return_value.scalars.return_value.first.return_value = budget
+
+        # Act
+        first = service.get_current_budget(2025, 1)
+        second = service.get_current_budget(2025, 1)
+        service.create_budget(name="Otro", period_type="monthly", year=2025, month=2)
+        third = service.get_current_budget(2025, 1)
+
+        # Assert
+        assert first is second is third is budget
+        assert mock_session.execute.call_count == 2
+
+    def test_get_current_budget_cache_expires(self, service, mock_session):
+        """Test la cache de presupuesto actual vence tras el TTL."""
+        # Arrange
+        mock_session.execute.return_value.scalars.return_value.first.return_value = None
+
+        # Act
+        with patch("src.services.budget_service.time.monotonic", side_effect=[0.0, 1.0, 10.0]):
+            service.get_current_budget(2025)
+            service.get_current_budget(2025)
+            service.get_current_budget(2025)
+
+        # Assert
+        assert mock_session.execute.call_count == 2
+
+    def test_update_budget_fields_single_statement(self, service, mock_session):
+        """Test actualizar campos de presupuesto con un UPDATE e invalidar la cache."""
+        # Arrange
+        mock_session.execute.return_value.scalars.return_value.first.return_value = None
+        service.get_current_budget(2025, 1)
+        mock_session.execute.reset_mock()
+        mock_session.execute.return_value.rowcount = 1
+
+        # Act
+        result = service.update_budget_fields(
+            "bud-123", name="Nuevo", description=None, unknown="ignored"
+        )
+        service.get_current_budget(2025, 1)
+
+        # Assert
+        assert result == 1
+        params = mock_session.execute.call_args_list[0].args[0].compile().params
+        assert params["name"] == "Nuevo"
+        assert "description" not in params and "unknown" not in params
+        mock_session.commit.assert_called_once()
+        mock_session.query.assert_not_called()
+        assert mock_session.execute.call_count == 2  # UPDATE y presupuesto sin cache
+
+    def test_update_budget_fields_no_changes(self, service, mock_session):
+        """Test no ejecutar UPDATE si no hay campos permitidos."""
+        # Act
+        result = service.update_budget_fields("bud-123", unknown="ignored", name=None)
+
+        # Assert
+        assert result == 0
+        mock_session.execute.assert_not_called()
+        mock_session.commit.assert_not_called()
+
+    def test_delete_budget_removes_categories_first(self, service, mock_session):
+        """Test eliminar presupuesto borrando antes sus categorías, sin depender del CASCADE."""
+        # Arrange
+        mock_session.execute.return_value.rowcount = 1
+
+        # Act
+        result = service.delete_budget("bud-123")
+
+        # Assert
+        assert result is True
+        tables = [call.args[0].table.name for call in mock_session.execute.call_args_list]
+        assert tables == ["budget_categories", "budgets"]
+        mock_session.commit.assert_called_once()
+
+    def test_delete_budget_not_found(self, service, mock_session):
+        """Test eliminar presupuesto inexistente no confirma cambios."""
+        # Arrange
+        mock_session.execute.return_value.rowcount = 0
+
+        # Act
+        result = service.delete_budget("bud-404")
+
+        # Assert
+        assert result is False
+        mock_session.rollback.assert_called_once()
+        mock_session.commit.assert_not_called()
@@ -11,15 +11,28 @@ from src.cli.commands.transactions import transactions_app
 from src.database.models import Transaction, TransactionType
 
 
+@pytest.fixture(scope="module")
+def runner():
+    """Runner para testing de CLI (compartido por el módulo)."""
+    return CliRunner()
+
+
+@pytest.fixture(scope="module")
+def service_class_patch():
+    """Parchear TransactionService una sola vez para todo el módulo."""
+    with patch('src.cli.commands.transactions.TransactionService') as mock_service_class:
+        yield mock_service_class
+
+
 class TestTransactionsCLI:
     """Tests para comandos CLI de transacciones."""
 
     @pytest.fixture
-    def runner(self):
-        """Runner para testing de CLI."""
-        return CliRunner()
+    def mock_service_class(self, service_class_patch):
+        """Clase TransactionService parcheada, sin estado de tests anteriores."""
+        service_class_patch.reset_mock(return_value=True, side_effect=True)
+        return service_class_patch
 
-    @patch('src.cli.commands.transactions.TransactionService')
     def test_add_transaction_success(self, mock_service_class, runner):
         """Test agregar transacción exitosamente."""
         # Arrange
@@ -57,7 +70,6 @@ class TestTransactionsCLI:
         mock_service.create_transaction.assert_called_once()
         mock_service.close.assert_called_once()
 
-    @patch('src.cli.commands.transactions.TransactionService')
     def test_add_transaction_invalid_type(self, mock_service_class, runner):
         """Test agregar transacción con tipo inválido."""
         # Act
@@ -70,7 +82,6 @@ class TestTransactionsCLI:
         assert result.exit_code == 1
         assert "❌ Tipo de transacción debe ser 'income' o 'expense'" in result.stdout
 
-    @patch('src.cli.commands.transactions.TransactionService')
     def test_add_transaction_service_error(self, mock_service_class, runner):
         """Test error del servicio al agregar transacción."""
         # Arrange
@@ -87,7 +98,6 @@ class TestTransactionsCLI:
         assert result.exit_code == 1
         assert "❌ Error al agregar transacción" in result.stdout
 
-    @patch('src.cli.commands.transactions.TransactionService')
     def test_list_transactions_success(self, mock_service_class, runner):
         """Test listar transacciones exitosamente."""
         # Arrange
@@ -98,11 +108,11 @@ class TestTransactionsCLI:
         mock_transaction.id = "trans-123"
         mock_transaction.transaction_date.strftime.return_value = "2025-06-23"
         mock_transaction.description = "Test transaction"
-        mock_transaction.category.name = "food"
+        mock_transaction.category_name = "food"
         mock_transaction.transaction_type = TransactionType.EXPENSE
         mock_transaction.amount = Decimal("25.50")
 
-        mock_service.get_transactions.return_value = [mock_transaction]
+        mock_service.get_transactions_summary_rows.return_value = [mock_transaction]
         mock_service.get_total_income.return_value = Decimal("0.00")
         mock_service.get_total_expenses.return_value = Decimal("25.50")
 
@@ -115,16 +125,15 @@ class TestTransactionsCLI:
         assert "25.50" in result.stdout
         assert "📋 Últimas" in result.stdout
 
-        mock_service.get_transactions.assert_called_once()
+        mock_service.get_transactions_summary_rows.assert_called_once()
         mock_service.close.assert_called_once()
 
-    @patch('src.cli.commands.transactions.TransactionService')
     def test_list_transactions_with_filters(self, mock_service_class, runner):
         """Test listar transacciones con filtros."""
         # Arrange
         mock_service = Mock()
         mock_service_class.return_value = mock_service
-        mock_service.get_transactions.return_value = []
+        mock_service.get_transactions_summary_rows.return_value = []
         mock_service.get_total_income.return_value = Decimal("0.00")
         mock_service.get_total_expenses.return_value = Decimal("0.00")
 
@@ -138,13 +147,14 @@ class TestTransactionsCLI:
 
         # Assert
         assert result.exit_code == 0
-        mock_service.get_transactions.assert_called_once_with(
+        mock_service.get_transactions_summary_rows.assert_called_once_with(
             limit=10,
             transaction_type=TransactionType.EXPENSE,
-            category_name="food"
+            category_name="food",
+            account_name=None,
+            search_text=None
         )
 
-    @patch('src.cli.commands.transactions.TransactionService')
     def test_summary_transactions(self, mock_service_class, runner):
         """Test resumen de transacciones."""
         # Arrange
@@ -2,23 +2,24 @@
 
 from __future__ import annotations
 
+import math
 import pytest
 from decimal import Decimal
-from datetime import datetime, date
+from datetime import datetime, date, timedelta
 from unittest.mock import Mock, patch
 
-from src.services.investment_service import InvestmentService
+from src.services.investment_service import (
+    InvestmentService,
+    PerformanceEntry,
+    _ACTIVE_INVESTMENTS,
+    _ALL_INVESTMENTS,
+)
 from src.database.models import Investment, InvestmentType
 
 
 class TestInvestmentService:
     """Tests para InvestmentService."""
 
-    @pytest.fixture
-    def mock_session(self):
-        """Mock de sesión de base de datos."""
-        return Mock()
-
     @pytest.fixture
     def service(self, mock_session):
         """Instancia del servicio con mock de sesión."""
@@ -84,57 +85,60 @@ class TestInvestmentService:
     def test_get_investments_active_only(self, service, mock_session):
         """Test obtener solo inversiones activas."""
         # Arrange
-        mock_query = Mock()
-        mock_session.query.return_value = mock_query
-        mock_query.filter.return_value = mock_query
-        mock_query.order_by.return_value = mock_query
-        mock_query.all.return_value = []
+        mock_session.execute.return_value.scalars.return_value.all.return_value = []
 
         # Act
         result = service.get_investments(active_only=True)
 
         # Assert
         assert result == []
-        mock_session.query.assert_called_once_with(Investment)
-        mock_query.filter.assert_called_once()
+        mock_session.execute.assert_called_once_with(_ACTIVE_INVESTMENTS)
 
     def test_get_investments_all(self, service, mock_session):
         """Test obtener todas las inversiones."""
         # Arrange
-        mock_query = Mock()
-        mock_session.query.return_value = mock_query
-        mock_query.order_by.return_value = mock_query
-        mock_query.all.return_value = []
+        mock_session.execute.return_value.scalars.return_value.all.return_value = []
 
         # Act
         result = service.get_investments(active_only=False)
 
         # Assert
         assert result == []
-        mock_session.query.assert_called_once_with(Investment)
+        mock_session.execute.assert_called_once_with(_ALL_INVESTMENTS)
+
+    def test_iter_investments_streams_in_batches(self, service, mock_session):
+        """Test recorrer inversiones en lotes con yield_per."""
+        # Arrange
+        investments = [Mock(spec=Investment), Mock(spec=Investment)]
+        mock_session.execute.return_value.scalars.return_value = iter(investments)
+
+        # Act
+        result = service.iter_investments(batch=500)
+
+        # Assert
+        mock_session.execute.assert_not_called()  # Generador perezoso
+        assert list(result) == investments
+        mock_session.execute.assert_called_once_with(
+            _ACTIVE_INVESTMENTS, execution_options={'yield_per': 500}
+        )
 
     def test_get_investment_by_id_found(self, service, mock_session):
         """Test obtener inversión por ID existente."""
         # Arrange
         mock_investment = Mock()
-        mock_query = Mock()
-        mock_session.query.return_value = mock_query
-        mock_query.filter.return_value = mock_query
-        mock_query.first.return_value = mock_investment
+        mock_session.get.return_value = mock_investment
 
         # Act
         result = service.get_investment_by_id("inv-123")
 
         # Assert
         assert result == mock_investment
+        mock_session.get.assert_called_once_with(Investment, "inv-123")
 
     def test_get_investment_by_id_not_found(self, service, mock_session):
         """Test obtener inversión por ID inexistente."""
         # Arrange
-        mock_query = Mock()
-        mock_session.query.return_value = mock_query
-        mock_query.filter.return_value = mock_query
-        mock_query.first.return_value = None
+        mock_session.get.return_value = None
 
         # Act
         result = service.get_investment_by_id("inv-999")
@@ -184,3 +188,87 @@ class TestInvestmentService:
         # Assert
         assert result is None
         mock_session.commit.assert_not_called()
+
+    def test_update_investment_fields_single_statement(self, service, mock_session):
+        """Test actualizar campos de inversión sin cargarla."""
+        # Arrange
+        mock_session.execute.return_value.rowcount = 1
+
+        # Act
+        result = service.update_investment_fields(
+            "inv-123", name="MSFT", shares=None, unknown="ignored"
+        )
+
+        # Assert
+        assert result == 1
+        mock_session.execute.assert_called_once()
+        mock_session.commit.assert_called_once()
+        mock_session.query.assert_not_called()
+
+    def test_update_investment_fields_no_changes(self, service, mock_session):
+        """Test no ejecutar UPDATE si no hay campos permitidos."""
+        # Act
+        result = service.update_investment_fields("inv-123", unknown="ignored")
+
+        # Assert
+        assert result == 0
+        mock_session.execute.assert_not_called()
+
+    def test_get_investment_performance_annualized_return(self, service, mock_session):
+        """Test calcular rendimiento anualizado de una inversión."""
+        # Arrange
+        mock_investment = Mock()
+        mock_investment.initial_amount = Decimal("1000.00")
+        mock_investment.current_value = Decimal("1100.00")
+        mock_investment.purchase_date = datetime.now() - timedelta(days=730)
+        mock_investment.investment_type = InvestmentType.STOCK
+        service.get_investment_by_id = Mock(return_value=mock_investment)
+
+        # Act
+        result = service.get_investment_performance("inv-123")
+
+        # Assert
+        performance = result['performance']
+        assert performance['holding_days'] == 730
+        assert performance['return_percentage'] == pytest.approx(10.0)
+        assert performance['annualized_return'] == pytest.approx(4.88, abs=0.01)
+
+    def test_get_investment_performance_huge_short_term_gain(self, service):
+        """Test rendimiento anualizado infinito (sin OverflowError) para 100x en un día."""
+        # Arrange
+        mock_investment = Mock()
+        mock_investment.initial_amount = Decimal("100.00")
+        mock_investment.current_value = Decimal("10000.00")
+        mock_investment.purchase_date = datetime.now() - timedelta(days=1)
+        mock_investment.investment_type = InvestmentType.CRYPTO
+        service.get_investment_by_id = Mock(return_value=mock_investment)
+
+        # Act
+        result = service.get_investment_performance("inv-123")
+
+        # Assert
+        performance = result['performance']
+        assert performance['holding_days'] == 1
+        assert performance['return_percentage'] == Decimal("9900")
+        assert performance['annualized_return'] == math.inf
+
+    def test_performance_entry_named_tuple(self):
+        """Test entrada de ranking de rendimiento como PerformanceEntry."""
+        # Arrange
+        investment = Investment(
+            id="inv-123",
+            name="AAPL",
+            investment_type=InvestmentType.STOCK,
+            initial_amount=Decimal("1000.00"),
+            current_value=Decimal("1250.00")
+        )
+
+        # Act
+        entry = InvestmentService._performance_entry(investment)
+
+        # Assert
+        assert isinstance(entry, PerformanceEntry)
+        assert entry.type == "stock"
+        assert entry.return_amount == Decimal("250.00")
+        assert entry.return_percentage == pytest.approx(25.0)
+        assert entry._asdict()['name'] == "AAPL"
@@ -0,0 +1,188 @@
+"""Tests para el servicio de reportes."""
+
+from __future__ import annotations
+
+import pytest
+from decimal import Decimal
+from datetime import datetime, date
+from unittest.mock import patch
+
+from src.database.connection import create_db_session
+from src.database.models import TransactionType
+from src.services.report_service import ReportService
+from src.services.transaction_service import TransactionService
+
+
+class TestReportService:
+    """Tests para ReportService sobre una base de datos SQLite temporal."""
+
+    @pytest.fixture
+    def db_session(self, test_db):
+        """Sesión sobre la base de datos de test."""
+        session = create_db_session()
+        yield session
+        session.close()
+
+    @pytest.fixture
+    def service(self, db_session):
+        """Instancia del servicio de reportes."""
+        return ReportService(db_session=db_session)
+
+    @pytest.fixture
+    def transactions(self, db_session):
+        """Transacciones de ejemplo en enero y febrero de 2025."""
+        service = TransactionService(db_session=db_session)
+        data = [
+            ("1000.00", TransactionType.INCOME, "salario", datetime(2025, 1, 2)),
+            ("50.00", TransactionType.EXPENSE, "alimentacion", datetime(2025, 1, 5)),
+            ("30.00", TransactionType.EXPENSE, "alimentacion", datetime(2025, 1, 20)),
+            ("120.00", TransactionType.EXPENSE, "transporte", datetime(2025, 1, 21)),
+            ("25.00", TransactionType.EXPENSE, "salud", datetime(2025, 2, 3)),
+        ]
+        for amount, trans_type, category, when in data:
+            service.create_transaction(
+                amount=Decimal(amount),
+                description=f"{category} {when:%d/%m}",
+                transaction_type=trans_type,
+                category_name=category,
+                transaction_date=when
+            )
+
+    def test_transactions_summary_aggregates_in_sql(self, service, transactions):
+        """Test resumen de transacciones de un mes."""
+        # Act
+        result = service._get_transactions_summary(date(2025, 1, 1), date(2025, 1, 31))
+
+        # Assert
+        assert result['income_total'] == Decimal("1000.00")
+        assert result['expense_total'] == Decimal("200.00")
+        assert result['net_amount'] == Decimal("800.00")
+        assert result['transactions_count'] == 4
+        assert result['average_transaction'] == Decimal("300.00")
+        assert result['top_expense_categories'] == [
+            {'name': "transporte", 'amount': Decimal("120.00")},
+            {'name': "alimentacion", 'amount': Decimal("80.00")},
+        ]
+
+    def test_transactions_summary_empty_period(self, service, transactions):
+        """Test resumen de un período sin transacciones."""
+        # Act
+        result = service._get_transactions_summary(date(2024, 1, 1), date(2024, 1, 31))
+
+        # Assert
+        assert result['income_total'] == 0
+        assert result['expense_total'] == 0
+        assert result['transactions_count'] == 0
+        assert result['average_transaction'] == Decimal("0")
+        assert result['top_expense_categories'] == []
+
+    def test_cash_flow_report_weekly(self, service, transactions):
+        """Test flujo de efectivo semanal con períodos vacíos y saldo acumulado."""
+        # Act
+        result = service.generate_cash_flow_report(
+            date(2025, 1, 1), date(2025, 1, 31), granularity="weekly"
+        )
+
+        # Assert
+        cash_flow = result['cash_flow']
+        assert [cf['period_start'] for cf in cash_flow] == [
+            date(2025, 1, 1), date(2025, 1, 8), date(2025, 1, 15),
+            date(2025, 1, 22), date(2025, 1, 29)
+        ]
+        assert [cf['transactions_count'] for cf in cash_flow] == [2, 0, 2, 0, 0]
+        assert cash_flow[0]['net_flow'] == Decimal("950.00")
+        assert cash_flow[2]['expense'] == Decimal("150.00")
+        assert [cf['running_balance'] for cf in cash_flow] == [
+            Decimal("950.00"), Decimal("950.00"), Decimal("800.00"),
+            Decimal("800.00"), Decimal("800.00")
+        ]
+        assert result['summary']['final_balance'] == Decimal("800.00")
+        assert result['summary']['total_income'] == Decimal("1000.00")
+        assert result['summary']['total_expense'] == Decimal("200.00")
+        assert result['summary']['net_flow'] == Decimal("800.00")
+
+    def test_yearly_report_monthly_breakdown(self, service, transactions):
+        """Test reporte anual con desglose mensual desde consultas agrupadas."""
+        # Act
+        result = service.generate_yearly_report(2025)
+
+        # Assert
+        annual = result['annual_summary']
+        assert annual['income_total'] == Decimal("1000.00")
+        assert annual['expense_total'] == Decimal("225.00")
+        assert annual['transactions_count'] == 5
+        assert annual['top_expense_categories'][0] == {
+            'name': "transporte", 'amount': Decimal("120.00")
+        }
+
+        monthly = result['monthly_breakdown']
+        assert [m['month'] for m in monthly] == list(range(1, 13))
+        assert monthly[0]['transactions_count'] == 4
+        assert monthly[0]['net_amount'] == Decimal("800.00")
+        assert monthly[1]['top_expense_categories'] == [
+            {'name': "salud", 'amount': Decimal("25.00")}
+        ]
+        assert monthly[2]['transactions_count'] == 0
+        assert sum(m['expense_total'] for m in monthly) == annual['expense_total']
+
+    def test_transactions_summary_cached_until_transactions_change(self, service, db_session, transactions):
+        """Test el resumen se reutiliza hasta que TransactionService escribe."""
+        # Act
+        first = service._get_transactions_summary(date(2025, 1, 1), date(2025, 1, 31))
+        with patch.object(
+            service, '_compute_transactions_summary', wraps=service._compute_transactions_summary
+        ) as compute:
+            second = service._get_transactions_summary(date(2025, 1, 1), date(2025, 1, 31))
+            TransactionService(db_session=db_session).create_transaction(
+                amount=Decimal("10.00"),
+                description="café",
+                transaction_type=TransactionType.EXPENSE,
+                category_name="alimentacion",
+                transaction_date=datetime(2025, 1, 10)
+            )
+            third = service._get_transactions_summary(date(2025, 1, 1), date(2025, 1, 31))
+
+        # Assert
+        assert compute.call_count == 1
+        assert second == first
+        assert second is not first
+        assert third['expense_total'] == Decimal("210.00")
+        assert third['transactions_count'] == 5
+
+    def test_monthly_report_reuses_current_month_summary(self, service, transactions):
+        """Test el reporte mensual calcula el resumen del mes una sola vez."""
+        # Act
+        with patch.object(
+            service, '_get_transactions_summary', wraps=service._get_transactions_summary
+        ) as summary:
+            result = service.generate_monthly_report(2025, 2)
+
+        # Assert
+        assert [c.args for c in summary.call_args_list] == [
+            (date(2025, 2, 1), date(2025, 2, 28)),
+            (date(2025, 1, 1), date(2025, 1, 31)),
+        ]
+        trends = result['trends']
+        assert trends['current_month']['data'] is result['transactions']
+        assert trends['changes']['expense_change_percentage'] == pytest.approx(-87.5)
+
+    def test_transactions_summary_includes_whole_end_day(self, service, db_session, transactions):
+        """Test el último día del período se incluye completo, no solo la medianoche."""
+        # Arrange
+        TransactionService(db_session=db_session).create_transaction(
+            amount=Decimal("45.00"),
+            description="cena",
+            transaction_type=TransactionType.EXPENSE,
+            category_name="alimentacion",
+            transaction_date=datetime(2025, 1, 31, 21, 30)
+        )
+
+        # Act
+        summary = service._get_transactions_summary(date(2025, 1, 1), date(2025, 1, 31))
+        cash_flow = service.generate_cash_flow_report(
+            date(2025, 1, 31), date(2025, 1, 31), granularity="daily"
+        )
+
+        # Assert
+        assert summary['expense_total'] == Decimal("245.00")
+        assert cash_flow['cash_flow'][0]['expense'] == Decimal("45.00")
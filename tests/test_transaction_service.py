@@ -11,157 +11,417 @@ from src.services.transaction_service import TransactionService
 from src.database.models import Transaction, Category, Account, TransactionType
 
 
+# Categoría ya persistida que devuelve la búsqueda por nombre
+_EXISTING_CATEGORY = Category(id="cat-1", name="food")
+
+
+@pytest.fixture(scope="module")
+def mock_session(session_spec):
+    """Mock de sesión de base de datos (uno para todo el módulo)."""
+    return Mock(spec=session_spec)
+
+
+@pytest.fixture(scope="module")
+def service(mock_session):
+    """Instancia del servicio con mock de sesión (una para todo el módulo)."""
+    return TransactionService(db_session=mock_session)
+
+
 class TestTransactionService:
     """Tests para TransactionService."""
 
-    @pytest.fixture
-    def mock_session(self):
-        """Mock de sesión de base de datos."""
-        return Mock()
-
-    @pytest.fixture
-    def service(self, mock_session):
-        """Instancia del servicio con mock de sesión."""
-        return TransactionService(db_session=mock_session)
+    @pytest.fixture(autouse=True)
+    def reset_shared_state(self, service, mock_session):
+        """Limpiar la sesión y las caches del servicio compartidos tras cada test."""
+        yield
+        mock_session.reset_mock(return_value=True, side_effect=True)
+        service._clear_lookup_caches()
 
-    def test_create_transaction_success(self, service, mock_session):
-        """Test crear transacción exitosamente."""
+    @pytest.mark.parametrize(
+        "amount, description, tags, commit_error, expected_tags",
+        [
+            (Decimal("100.50"), "Test transaction", None, None, None),
+            (Decimal("50.00"), "Lunch", ["restaurant", "lunch"], None, '["restaurant", "lunch"]'),
+            (Decimal("100.00"), "Test", None, Exception("Database error"), None),
+        ],
+        ids=["success", "with_tags", "database_error"],
+    )
+    def test_create_transaction(
+        self, service_factory, amount, description, tags, commit_error, expected_tags
+    ):
+        """Test crear transacción: datos básicos, con tags y con error de base de datos."""
         # Arrange
-        mock_category = Mock()
-        mock_category.id = "cat-123"
-        mock_account = Mock()
-        mock_account.id = "acc-456"
+        service = service_factory()
+        mock_session = service.db_session
+        mock_session.commit.side_effect = commit_error
+        params = {
+            'amount': amount,
+            'description': description,
+            'transaction_type': TransactionType.EXPENSE,
+            'category_name': "food",
+            'account_name': "default",
+            'tags': tags,
+        }
 
-        service._get_or_create_category = Mock(return_value=mock_category)
-        service._get_or_create_account = Mock(return_value=mock_account)
+        # Act & Assert
+        if commit_error is not None:
+            with pytest.raises(Exception, match="Database error"):
+                service.create_transaction(**params)
+            mock_session.rollback.assert_called_once()
+            return
 
-        # Act
-        result = service.create_transaction(
-            amount=Decimal("100.50"),
-            description="Test transaction",
-            transaction_type=TransactionType.EXPENSE,
-            category_name="food",
-            account_name="default"
-        )
+        result = service.create_transaction(**params)
 
-        # Assert
         assert isinstance(result, Transaction)
-        assert result.amount == Decimal("100.50")
-        assert result.description == "Test transaction"
+        assert result.amount == amount
+        assert result.description == description
         assert result.transaction_type == TransactionType.EXPENSE
         assert result.category_id == "cat-123"
         assert result.account_id == "acc-456"
+        assert result.tags == expected_tags
 
         mock_session.add.assert_called_once()
         mock_session.commit.assert_called_once()
 
-    def test_create_transaction_with_tags(self, service, mock_session):
-        """Test crear transacción con tags."""
+    def test_create_transaction_invalid_payment_method(self, service_factory):
+        """Test método de pago desconocido: error de validación sin escribir."""
         # Arrange
-        mock_category = Mock()
-        mock_category.id = "cat-123"
-        mock_account = Mock()
-        mock_account.id = "acc-456"
-
-        service._get_or_create_category = Mock(return_value=mock_category)
-        service._get_or_create_account = Mock(return_value=mock_account)
-
-        # Act
-        result = service.create_transaction(
-            amount=Decimal("50.00"),
-            description="Lunch",
-            transaction_type=TransactionType.EXPENSE,
-            tags=["restaurant", "lunch"]
-        )
-
-        # Assert
-        assert result.tags == '["restaurant", "lunch"]'
-
-    def test_create_transaction_database_error(self, service, mock_session):
-        """Test error en base de datos al crear transacción."""
-        # Arrange
-        mock_session.commit.side_effect = Exception("Database error")
-        service._get_or_create_category = Mock(return_value=Mock(id="cat-123"))
-        service._get_or_create_account = Mock(return_value=Mock(id="acc-456"))
+        service = service_factory()
+        mock_session = service.db_session
 
         # Act & Assert
-        with pytest.raises(Exception, match="Database error"):
+        with pytest.raises(ValueError, match="Método de pago inválido: cheque"):
             service.create_transaction(
-                amount=Decimal("100.00"),
+                amount=Decimal("10.00"),
                 description="Test",
-                transaction_type=TransactionType.EXPENSE
+                transaction_type=TransactionType.EXPENSE,
+                payment_method="cheque"
             )
 
+        mock_session.add.assert_not_called()
         mock_session.rollback.assert_called_once()
 
+    def test_create_transactions_bulk_single_insert(self, service_factory):
+        """Test crear transacciones en lote con un único INSERT y un commit."""
+        # Arrange
+        service = service_factory()
+        mock_session = service.db_session
+        items = [
+            {
+                'amount': Decimal("10.00"),
+                'description': "Café",
+                'transaction_type': TransactionType.EXPENSE,
+                'category_name': "food",
+                'tags': ["desayuno"]
+            },
+            {
+                'amount': Decimal("500.00"),
+                'description': "Salario",
+                'transaction_type': TransactionType.INCOME,
+                'transaction_date': datetime(2025, 1, 1)
+            }
+        ]
+
+        # Act
+        result = service.create_transactions_bulk(items)
+
+        # Assert
+        assert result == 2
+        assert mock_session.execute.call_count == 2  # Transacciones y tags
+        mock_session.commit.assert_called_once()
+        mock_session.add.assert_not_called()
+        rows = mock_session.execute.call_args_list[0].args[1]
+        assert [row['category_id'] for row in rows] == ["cat-123", "cat-123"]
+        assert rows[0]['tags'] == '["desayuno"]'
+        assert rows[1]['transaction_date'] == datetime(2025, 1, 1)
+        assert len({row['id'] for row in rows}) == 2
+        tag_rows = mock_session.execute.call_args_list[1].args[1]
+        assert tag_rows == [{'transaction_id': rows[0]['id'], 'tag': "desayuno"}]
+
     def test_get_transactions_default_params(self, service, mock_session):
         """Test obtener transacciones con parámetros por defecto."""
         # Arrange
-        mock_query = Mock()
-        mock_session.query.return_value = mock_query
-        mock_query.join.return_value = mock_query
-        mock_query.order_by.return_value = mock_query
-        mock_query.limit.return_value = mock_query
-        mock_query.offset.return_value = mock_query
-        mock_query.all.return_value = []
+        mock_session.execute.return_value.scalars.return_value.all.return_value = []
 
         # Act
         result = service.get_transactions()
 
         # Assert
         assert result == []
-        mock_session.query.assert_called_once_with(Transaction)
+        mock_session.execute.assert_called_once()
+        statement = mock_session.execute.call_args.args[0]
+        assert "LEFT OUTER JOIN categories" in str(statement)  # Categoría con carga anticipada
+        assert "LIMIT" in str(statement)
 
-    def test_get_or_create_category_existing(self, service, mock_session):
-        """Test obtener categoría existente."""
+    def test_get_transactions_summary_rows_projection(self, service, mock_session):
+        """Test listado liviano con solo las columnas de la tabla."""
         # Arrange
-        mock_category = Mock()
-        mock_category.name = "food"
-        mock_query = Mock()
-        mock_session.query.return_value = mock_query
-        mock_query.filter.return_value = mock_query
-        mock_query.first.return_value = mock_category
+        mock_session.execute.return_value.all.return_value = []
 
         # Act
-        result = service._get_or_create_category("food")
+        result = service.get_transactions_summary_rows(category_name="food", limit=10)
 
         # Assert
-        assert result == mock_category
-        mock_session.add.assert_not_called()
+        assert result == []
+        statement = str(mock_session.execute.call_args.args[0])
+        assert "categories.name AS category_name" in statement
+        assert "transactions.notes" not in statement.split("FROM")[0]
+        assert "LIMIT" in statement
+
+    def test_iter_transactions_summary_rows_streams_in_batches(self, service, mock_session):
+        """Test recorrer filas de transacciones en lotes con yield_per."""
+        # Arrange
+        rows = [Mock(), Mock()]
+        mock_session.execute.return_value = iter(rows)
+
+        # Act
+        result = service.iter_transactions_summary_rows(batch=500, category_name="food")
 
-    def test_get_or_create_category_new(self, service, mock_session):
-        """Test crear nueva categoría."""
+        # Assert
+        mock_session.execute.assert_not_called()  # Generador perezoso
+        assert list(result) == rows
+        assert mock_session.execute.call_args.kwargs == {
+            'execution_options': {'yield_per': 500}
+        }
+        assert "LIMIT :" not in str(mock_session.execute.call_args.args[0])
+
+    def test_get_transactions_keyset_cursor(self, service, mock_session):
+        """Test paginación por cursor de fecha e ID en lugar de OFFSET."""
         # Arrange
-        mock_query = Mock()
-        mock_session.query.return_value = mock_query
-        mock_query.filter.return_value = mock_query
-        mock_query.first.return_value = None
+        mock_session.execute.return_value.scalars.return_value.all.return_value = []
 
         # Act
-        result = service._get_or_create_category("new_category")
+        service.get_transactions(after_date=datetime(2025, 1, 10), after_id="txn-1")
 
         # Assert
-        assert isinstance(result, Category)
-        assert result.name == "new_category"
-        assert result.description == "Categoría new_category"
+        statement = str(mock_session.execute.call_args.args[0])
+        assert "(transactions.transaction_date, transactions.id) <" in statement
+        assert "ORDER BY transactions.transaction_date DESC, transactions.id DESC" in statement
+
+    def test_get_transactions_keyset_requires_date_order(self, service, mock_session):
+        """Test el cursor solo es válido con el orden por fecha descendente."""
+        # Act & Assert
+        with pytest.raises(ValueError, match="date_desc"):
+            service.get_transactions(after_date=datetime(2025, 1, 10), order_by="amount_desc")
+
+        mock_session.execute.assert_not_called()
+
+    def test_get_summary_totals_in_one_query(self, service, mock_session):
+        """Test resumen con totales por tipo y cantidad en una sola consulta."""
+        # Arrange
+        mock_session.execute.return_value.one.return_value = (
+            Decimal("100.00"), Decimal("40.00"), 3
+        )
+        mock_session.execute.return_value.all.return_value = [("food", Decimal("40.00"))]
+
+        # Act
+        result = service.get_summary()
+
+        # Assert
+        assert result['income_total'] == Decimal("100.00")
+        assert result['expense_total'] == Decimal("40.00")
+        assert result['balance'] == Decimal("60.00")
+        assert result['total_transactions'] == 3
+        assert result['top_categories'] == [{'name': "food", 'amount': Decimal("40.00")}]
+        assert mock_session.execute.call_count == 2
+        assert "CASE WHEN" in str(mock_session.execute.call_args_list[0].args[0])
+
+    @pytest.fixture
+    def query_stub(self, request, chained_query):
+        """Query encadenada cuyo `first()` devuelve el parámetro indirecto."""
+        chained_query.first.return_value = request.param
+        return chained_query
+
+    @pytest.mark.parametrize(
+        "query_stub, method, name, expected_attrs",
+        [
+            (_EXISTING_CATEGORY, "_get_or_create_category", "food", None),
+            (None, "_get_or_create_category", "new_category",
+             {'description': "Categoría new_category"}),
+            (None, "_get_or_create_account", "new_account",
+             {'account_type': "general", 'balance': Decimal('0')}),
+        ],
+        ids=["category_existing", "category_new", "account_new"],
+        indirect=["query_stub"],
+    )
+    def test_get_or_create(self, service, mock_session, query_stub, method, name, expected_attrs):
+        """Test obtener una categoría/cuenta existente o crearla si no existe."""
+        # Arrange
+        existing = query_stub.first.return_value
+
+        # Act
+        result = getattr(service, method)(name)
+
+        # Assert
+        if existing is not None:
+            assert result is existing
+            mock_session.add.assert_not_called()
+            return
+
+        expected_cls = Category if method == "_get_or_create_category" else Account
+        assert isinstance(result, expected_cls)
+        assert result.name == name
+        for attribute, value in expected_attrs.items():
+            assert getattr(result, attribute) == value
         mock_session.add.assert_called_once()
         mock_session.flush.assert_called_once()
 
-    def test_get_or_create_account_new(self, service, mock_session):
-        """Test crear nueva cuenta."""
+    def test_get_or_create_category_upsert_cached(self, service, mock_session):
+        """Test resolver una categoría con un único upsert y reutilizarla."""
+        # Arrange
+        category = Category(id="cat-1", name="food")
+        mock_session.get_bind.return_value.dialect.name = "sqlite"
+        mock_session.execute.return_value.scalar_one.return_value = category
+
+        # Act
+        first = service._get_or_create_category("food")
+        second = service._get_or_create_category("food")
+
+        # Assert
+        assert first is category
+        assert second is category
+        mock_session.execute.assert_called_once()
+        mock_session.query.assert_not_called()
+
+    def test_get_or_create_account_cached(self, service, mock_session, chained_query):
+        """Test la segunda búsqueda de una cuenta usa la cache."""
         # Arrange
-        mock_query = Mock()
-        mock_session.query.return_value = mock_query
-        mock_query.filter.return_value = mock_query
-        mock_query.first.return_value = None
+        chained_query.first.return_value = None
 
         # Act
-        result = service._get_or_create_account("new_account")
+        first = service._get_or_create_account("wallet")
+        second = service._get_or_create_account("wallet")
 
         # Assert
-        assert isinstance(result, Account)
-        assert result.name == "new_account"
-        assert result.account_type == "general"
-        assert result.balance == Decimal('0')
+        assert second is first
+        mock_session.query.assert_called_once_with(Account)
         mock_session.add.assert_called_once()
-        mock_session.flush.assert_called_once()
+
+
+class TestTransactionSearch:
+    """Tests de búsqueda de texto sobre una base de datos SQLite temporal."""
+
+    @pytest.fixture
+    def service(self, test_db):
+        """Servicio sobre la base de datos de test."""
+        from src.database.connection import create_db_session
+
+        service = TransactionService(db_session=create_db_session())
+        yield service
+        service.close()
+
+    @pytest.fixture
+    def service_with_tags(self, service):
+        """Servicio con transacciones etiquetadas ya guardadas."""
+        service.create_transaction(
+            amount=Decimal("12.00"),
+            description="Almuerzo",
+            transaction_type=TransactionType.EXPENSE,
+            tags=["comida", "trabajo"]
+        )
+        service.create_transaction(
+            amount=Decimal("30.00"),
+            description="Supermercado",
+            transaction_type=TransactionType.EXPENSE,
+            tags=["comida"]
+        )
+        return service
+
+    @pytest.mark.parametrize("service_name", ["service", "service_with_tags"])
+    def test_filters_without_matches_return_empty(self, request, service_name):
+        """Test filtros sin coincidencias devuelven vacío con y sin datos guardados."""
+        # Arrange: la variante del servicio se construye solo al ejecutar el caso
+        service = request.getfixturevalue(service_name)
+
+        # Act & Assert
+        assert service.get_transactions(tags=["viaje"]) == []
+        assert service.get_transactions(tags=["comida", "viaje"]) == []
+        assert service.get_transactions_summary_rows(search_text="hotel") == []
+
+    def test_search_text_uses_full_text_index(self, service):
+        """Test búsqueda por prefijo de palabra en descripción y notas."""
+        # Arrange
+        dinner = service.create_transaction(
+            amount=Decimal("40.00"),
+            description="Cena restaurante",
+            transaction_type=TransactionType.EXPENSE,
+            notes="con amigos"
+        )
+        service.create_transaction(
+            amount=Decimal("15.00"),
+            description="Taxi",
+            transaction_type=TransactionType.EXPENSE
+        )
+
+        # Act
+        by_description = service.get_transactions(search_text="restau")
+        by_notes = service.get_transactions_summary_rows(search_text="amigos cena")
+        service.update_transaction(dinner.id, description="Almuerzo")
+        after_update = service.get_transactions(search_text="cena")
+
+        # Assert
+        assert [t.id for t in by_description] == [dinner.id]
+        assert [row.id for row in by_notes] == [dinner.id]
+        assert after_update == []
+
+    def test_tags_filter_uses_tag_table(self, service):
+        """Test filtrar por tags exige todos los tags y sigue los cambios de tags."""
+        # Arrange
+        lunch = service.create_transaction(
+            amount=Decimal("12.00"),
+            description="Almuerzo",
+            transaction_type=TransactionType.EXPENSE,
+            tags=["comida", "trabajo"]
+        )
+        service.create_transaction(
+            amount=Decimal("30.00"),
+            description="Supermercado",
+            transaction_type=TransactionType.EXPENSE,
+            tags=["comida"]
+        )
+        service.create_transactions_bulk([{
+            'amount': Decimal("8.00"),
+            'description': "Café",
+            'transaction_type': TransactionType.EXPENSE,
+            'tags': ["trabajo"]
+        }])
+
+        # Act
+        both = service.get_transactions(tags=["comida", "trabajo"])
+        work = service.get_transactions_summary_rows(tags=["trabajo"])
+        service.update_transaction(lunch.id, tags=["comida"])
+        after_update = service.get_transactions(tags=["trabajo"])
+
+        # Assert
+        assert [t.id for t in both] == [lunch.id]
+        assert len(work) == 2
+        assert [t.description for t in after_update] == ["Café"]
+        assert lunch.parsed_tags == ["comida"]
+
+    @pytest.mark.parametrize(
+        "tags", [["food", "travel"], ["travel", "food"]], ids=["food_first", "travel_first"]
+    )
+    def test_tags_filter_requires_every_tag(self, service, tags):
+        """Test varios tags: no basta con coincidir con el último de la lista."""
+        # Arrange
+        trip = service.create_transaction(
+            amount=Decimal("60.00"),
+            description="Cena en viaje",
+            transaction_type=TransactionType.EXPENSE,
+            tags=["food", "travel"]
+        )
+        for description, only_tag in (("Pasaje", "travel"), ("Mercado", "food")):
+            service.create_transaction(
+                amount=Decimal("20.00"),
+                description=description,
+                transaction_type=TransactionType.EXPENSE,
+                tags=[only_tag]
+            )
+
+        # Act
+        transactions = service.get_transactions(tags=tags)
+        rows = service.get_transactions_summary_rows(tags=tags)
+
+        # Assert
+        assert [t.id for t in transactions] == [trip.id]
+        assert [row.id for row in rows] == [trip.id]
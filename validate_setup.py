@@ -5,6 +5,8 @@ import json
 import sys
 from pathlib import Path
 
+from validate_project import existing_paths, load_vscode_settings
+
 
 def validate_vscode_setup():
     """Validar que VS Code esté configurado correctamente."""
@@ -16,10 +18,8 @@ def validate_vscode_setup():
         ".vscode/extensions.json"
     ]
 
-    missing_files = []
-    for file_path in required_files:
-        if not Path(file_path).exists():
-            missing_files.append(file_path)
+    existing = existing_paths(required_files)
+    missing_files = [file_path for file_path in required_files if file_path not in existing]
 
     if missing_files:
         print("❌ Archivos de configuración faltantes:")
@@ -30,8 +30,7 @@ def validate_vscode_setup():
     settings_file = Path(".vscode/settings.json")
     if settings_file.exists():
         try:
-            with open(settings_file) as f:
-                settings = json.load(f)
+            settings = load_vscode_settings()
 
             critical_settings = {
                 "python.analysis.typeCheckingMode": "strict",
@@ -82,15 +81,9 @@ def validate_project_structure():
         ".vscode/"
     ]
 
-    missing_files = []
-    for file_path in required_files:
-        if not Path(file_path).exists():
-            missing_files.append(file_path)
-
-    missing_dirs = []
-    for dir_path in recommended_dirs:
-        if not Path(dir_path).exists():
-            missing_dirs.append(dir_path)
+    existing = existing_paths(required_files + recommended_dirs)
+    missing_files = [file_path for file_path in required_files if file_path not in existing]
+    missing_dirs = [dir_path for dir_path in recommended_dirs if dir_path not in existing]
 
     if missing_files:
         print("❌ Archivos requeridos faltantes:")
@@ -120,10 +113,8 @@ def validate_sales_command():
         "tests/test_basic.py"
     ]
 
-    missing_modules = []
-    for module_path in required_modules:
-        if not Path(module_path).exists():
-            missing_modules.append(module_path)
+    existing = existing_paths(required_modules)
+    missing_modules = [module_path for module_path in required_modules if module_path not in existing]
 
     if missing_modules:
         print("❌ Módulos de Sales Command faltantes:")